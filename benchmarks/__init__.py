@@ -0,0 +1,3 @@
+"""
+Benchmarks for the newsletter bot. Each module can be run with `python -m benchmarks.<module>`.
+"""
@@ -0,0 +1,100 @@
+"""
+Benchmark of the stages of a main.py cycle against the local LinkedIn stand-in.
+
+Each stage (ledger load, modal scroll, card extraction, subscription, sharing, ledger save) is measured for wall time,
+WebDriver command count and peak RSS of the bot and browser processes, for each requested modal size. Compare a run
+with `--no-trim` to see the effect of the resource-trimming profile of the browser.
+
+Run with `python -m benchmarks.cycle --cards 100 1000 10000`.
+"""
+import argparse
+import os
+import tempfile
+from typing import Dict, List
+
+from selenium.webdriver.remote.webelement import WebElement
+
+from benchmarks.measure import StageRecorder, write_results
+from benchmarks.url_index import make_urls
+from driver_manager import DriverManager
+from harness.fixture_server import FixtureServer
+from internet_manager import connectivity
+from linkedin_scraper import extract_newsletter_cards, handle_subscription, open_newsletter_modal, \
+    scroll_to_bottom_of_modal
+from newsletter_sharing import share_newsletters
+from retries import Failure
+from scheduler import scheduler
+from utils import UrlIndex, open_store
+
+
+def benchmark_cycle(card_count: int, ledger_size: int, share_count: int, latency: float,
+                    trim_resources: bool = True) -> Dict[str, dict]:
+    """
+    Run one cycle against a fresh fixture server, browser session and ledger, measuring each stage.
+
+    :param card_count: Number of newsletter cards in the modal
+    :param ledger_size: Number of unrelated URLs already in the ledger
+    :param share_count: Number of newsletters to repost
+    :param latency: Response latency of the fixture pages in seconds
+    :param trim_resources: Launch the browser with the resource-trimming profile
+    :return: Measurements of each stage
+    """
+    with tempfile.TemporaryDirectory() as work_dir, \
+            FixtureServer(card_count=card_count, latency=latency) as server:
+        connectivity.configure(probe_url=server.base_url)
+        driver_manager = DriverManager(user_data_dir=os.path.join(work_dir, "profile"), headless=True,
+                                       trim_resources=trim_resources, memory_limit_mb=None)
+        try:
+            driver = driver_manager.get_driver()
+            recorder = StageRecorder(driver)
+
+            with open_store(file_name=os.path.join(work_dir, "newsletters.db")) as store:
+                store.add_many(make_urls(ledger_size))
+
+                with recorder.stage("ledger_load"):
+                    url_index = UrlIndex.from_store(store)
+
+                with recorder.stage("modal_scroll"):
+                    modal: WebElement = open_newsletter_modal(driver, base_url=server.base_url)
+                    scroll_to_bottom_of_modal(driver, modal)
+
+                with recorder.stage("card_extraction"):
+                    cards = extract_newsletter_cards(driver, modal)
+
+                subscribed: List[str] = []
+                with recorder.stage("subscription"):
+                    failed_attempts: Dict[str, Failure] = {}
+                    for card in cards:
+                        handle_subscription(driver, modal, card, url_index, subscribed, failed_attempts)
+
+                with recorder.stage("sharing"):
+                    share_newsletters(driver, newsletter_urls=subscribed[:share_count])
+
+                with recorder.stage("ledger_save"):
+                    store.add_many(subscribed)
+        finally:
+            driver_manager.quit()
+    return recorder.stages
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the stages of a cycle against the LinkedIn stand-in.")
+    parser.add_argument("--cards", type=int, nargs="+", default=[100, 1000], help="Number of cards in the modal")
+    parser.add_argument("--ledger-size", type=int, default=10_000, help="Number of URLs already in the ledger")
+    parser.add_argument("--shares", type=int, default=10, help="Number of newsletters to repost per run")
+    parser.add_argument("--latency", type=float, default=0.05, help="Response latency of the pages in seconds")
+    parser.add_argument("--keep-pacing", action="store_true", help="Keep the rate limits of the actions")
+    parser.add_argument("--no-trim", action="store_true", help="Launch the browser without the trimming profile")
+    parser.add_argument("--output", default="bench_cycle.json", help="Path of the JSON results file")
+    args = parser.parse_args()
+
+    if not args.keep_pacing:
+        scheduler.disable()
+
+    runs = []
+    for cards in args.cards:
+        print(f"\n--- {cards} cards ---")
+        runs.append({"cards": cards, "stages": benchmark_cycle(card_count=cards, ledger_size=args.ledger_size,
+                                                               share_count=args.shares, latency=args.latency,
+                                                               trim_resources=not args.no_trim)})
+    write_results(args.output, benchmark="cycle", parameters=vars(args), runs=runs)
@@ -0,0 +1,59 @@
+"""
+Benchmark of loading and saving the newsletter ledger as it grows, for the Excel file and the SQLite ledger.
+
+Run with `python -m benchmarks.ledger --sizes 1000 10000 100000`.
+"""
+import argparse
+import os
+import tempfile
+from typing import Dict
+
+from benchmarks.measure import StageRecorder, write_results
+from benchmarks.url_index import make_urls
+from utils import UrlIndex, load_newsletters_from_excel, open_store, save_newsletters_to_excel
+
+
+def benchmark_ledger(size: int, batch: int) -> Dict[str, dict]:
+    """
+    Measure loading a ledger of the given size and saving a batch of new URLs to it.
+
+    :param size: Number of URLs already in the ledger
+    :param batch: Number of new URLs saved per cycle
+    :return: Measurements of each stage
+    """
+    urls = make_urls(size + batch)
+    existing_urls, new_urls = urls[:size], urls[size:]
+    recorder = StageRecorder()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        excel_file = os.path.join(work_dir, "subscribed_newsletters.xlsx")
+        save_newsletters_to_excel(existing_urls, file_name=excel_file)
+
+        with recorder.stage("excel_load"):
+            load_newsletters_from_excel(file_name=excel_file)
+        with recorder.stage("excel_save"):
+            save_newsletters_to_excel(new_urls, file_name=excel_file)
+
+        with open_store(file_name=os.path.join(work_dir, "newsletters.db")) as store:
+            store.add_many(existing_urls)
+
+            with recorder.stage("sqlite_load"):
+                UrlIndex.from_store(store)
+            with recorder.stage("sqlite_save"):
+                store.add_many(new_urls)
+    return recorder.stages
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the ledger load and save as the ledger grows.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="Number of URLs already in the ledger")
+    parser.add_argument("--batch", type=int, default=100, help="Number of new URLs saved per cycle")
+    parser.add_argument("--output", default="bench_ledger.json", help="Path of the JSON results file")
+    args = parser.parse_args()
+
+    runs = []
+    for ledger_size in args.sizes:
+        print(f"\n--- {ledger_size} URLs ---")
+        runs.append({"size": ledger_size, "stages": benchmark_ledger(size=ledger_size, batch=args.batch)})
+    write_results(args.output, benchmark="ledger", parameters=vars(args), runs=runs)
@@ -0,0 +1,127 @@
+"""
+Helpers to measure wall time, WebDriver command count and peak RSS of benchmark stages.
+"""
+import json
+import os
+import platform
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from metrics import process_tree_rss
+
+
+class RssSampler:
+    """
+    Samples the RSS of a process tree in a background thread and keeps the peak.
+    """
+
+    def __init__(self, root_pids: List[int], interval: float = 0.1) -> None:
+        """
+        :param root_pids: PIDs of the processes to sample, together with their descendants
+        :param interval: Number of seconds between two samples
+        """
+        self.root_pids = root_pids
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self) -> None:
+        self.peak_bytes = max(self.peak_bytes, sum(process_tree_rss(pid) for pid in self.root_pids))
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RssSampler":
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+class CommandCounter:
+    """
+    Counts the WebDriver commands sent by a driver by wrapping its ``execute`` method.
+    """
+
+    def __init__(self, driver: WebDriver) -> None:
+        """
+        :param driver: WebDriver instance to instrument
+        """
+        self.count = 0
+        self.by_command: Dict[str, int] = {}
+        execute = driver.execute
+
+        def counting_execute(driver_command: str, params: dict | None = None):
+            self.count += 1
+            self.by_command[driver_command] = self.by_command.get(driver_command, 0) + 1
+            return execute(driver_command, params)
+
+        driver.execute = counting_execute
+
+
+class StageRecorder:
+    """
+    Records the wall time, WebDriver command count and peak RSS of named stages.
+    """
+
+    def __init__(self, driver: WebDriver | None = None) -> None:
+        """
+        :param driver: WebDriver instance whose commands and browser processes are measured, if any
+        """
+        self.commands = CommandCounter(driver) if driver is not None else None
+        self.root_pids = [os.getpid()]
+        if driver is not None and getattr(driver, "service", None) and driver.service.process:
+            self.root_pids.append(driver.service.process.pid)  # chromedriver, parent of the Chrome processes
+        self.stages: Dict[str, dict] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Measure the enclosed block as a stage.
+
+        :param name: Name of the stage
+        """
+        commands_before = self.commands.count if self.commands else 0
+        start = time.perf_counter()
+        with RssSampler(self.root_pids) as sampler:
+            yield
+        self.stages[name] = {
+            "wall_s": time.perf_counter() - start,
+            "webdriver_commands": (self.commands.count - commands_before) if self.commands else 0,
+            "peak_rss_bytes": sampler.peak_bytes,
+        }
+        print(f"{name:<20} {self.stages[name]['wall_s']:>9.3f}s {self.stages[name]['webdriver_commands']:>7} cmds "
+              f"{sampler.peak_bytes / 2 ** 20:>9.1f} MiB")
+
+
+def write_results(file_name: str, benchmark: str, parameters: dict, runs: List[dict]) -> None:
+    """
+    Write benchmark results as JSON so that runs can be compared over time.
+
+    :param file_name: Path of the JSON file
+    :param benchmark: Name of the benchmark
+    :param parameters: Parameters of the benchmark
+    :param runs: Measurements of each run
+    """
+    results = {
+        "benchmark": benchmark,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+        "runs": runs,
+    }
+    with open(file_name, mode="w", encoding="utf-8") as results_file:
+        json.dump(results, results_file, indent=2)
+    print(f"Saved benchmark results to {file_name}")
@@ -0,0 +1,69 @@
+"""
+Micro-benchmark for UrlIndex lookups at different ledger sizes.
+
+Run with `python -m benchmarks.url_index`.
+"""
+import argparse
+import random
+import time
+from typing import List
+
+from utils import UrlIndex
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+
+def make_urls(count: int) -> List[str]:
+    """
+    Generate newsletter URLs in the shape LinkedIn uses.
+
+    :param count: Number of URLs to generate
+    :return: List of newsletter URLs
+    """
+    return [f"https://www.linkedin.com/newsletters/newsletter-{i}-{7000000000000000000 + i}/" for i in range(count)]
+
+
+def benchmark_lookups(size: int, lookups: int) -> dict:
+    """
+    Build an index of the given size and time hit and miss lookups against it.
+
+    :param size: Number of URLs stored in the index
+    :param lookups: Number of lookups of each kind to time
+    :return: Dictionary of timings in microseconds per operation
+    """
+    urls = make_urls(size)
+    start = time.perf_counter()
+    index = UrlIndex(urls)
+    build_seconds = time.perf_counter() - start
+
+    # Look up stored URLs in the variants the page hands out (tracking query string, no trailing slash)
+    hits = [f"{url.rstrip('/')}?trk=public_post" for url in random.sample(urls, k=min(lookups, size))]
+    misses = [f"https://www.linkedin.com/newsletters/missing-{i}/" for i in range(lookups)]
+
+    start = time.perf_counter()
+    found = sum(url in index for url in hits)
+    hit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    found += sum(url in index for url in misses)
+    miss_seconds = time.perf_counter() - start
+
+    assert found == len(hits), "All stored URLs should be found and no missing URL should be"
+    return {
+        "size": size,
+        "build_ms": build_seconds * 1000,
+        "hit_us": hit_seconds / len(hits) * 1_000_000,
+        "miss_us": miss_seconds / len(misses) * 1_000_000,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark UrlIndex lookups.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Number of stored URLs")
+    parser.add_argument("--lookups", type=int, default=10_000, help="Number of lookups to time per size")
+    args = parser.parse_args()
+
+    print(f"{'stored URLs':>12} {'build (ms)':>12} {'hit (us/op)':>12} {'miss (us/op)':>13}")
+    for stored in args.sizes:
+        result = benchmark_lookups(size=stored, lookups=args.lookups)
+        print(f"{result['size']:>12,} {result['build_ms']:>12.1f} {result['hit_us']:>12.3f} {result['miss_us']:>13.3f}")
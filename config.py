@@ -0,0 +1,52 @@
+"""
+This module contains the configuration of the bot, read from a JSON file.
+
+Every setting has a default, so the file only needs the settings that differ from it, e.g.:
+
+    {"headless": true, "wait_timeout": 15, "cycle_interval": 300}
+"""
+import json
+import os
+from typing import NamedTuple
+
+from scheduler import DEFAULT_CONFIG_FILE as DEFAULT_PACING_FILE
+from utils import DEFAULT_EXCEL_FILE, DEFAULT_LEDGER_FILE
+
+DEFAULT_CONFIG_FILE = "config.json"
+
+
+class Config(NamedTuple):
+    """
+    Settings of a run.
+    """
+    ledger_file: str = DEFAULT_LEDGER_FILE  # SQLite ledger, which also holds the durable share queue
+    excel_file: str = DEFAULT_EXCEL_FILE  # Excel file used by ledger exports and imports
+    cookies_file: str = "linkedin_cookies.json"  # JSON cookie store
+    chrome_profile: str = "chrome_profile"  # Chrome user-data directory
+    sharer_chrome_profile: str = "chrome_profile_sharer"  # Chrome user-data directory of the pipeline's sharing stage
+    headless: bool = False  # Run Chrome without a window
+    trim_resources: bool = True  # Block images, media, fonts and trackers and return from navigations on DOM ready
+    memory_limit_mb: float | None = 1500  # Chrome memory above which the tab, then the browser, is recycled
+    wait_timeout: float = 10  # Maximum number of seconds to wait for the page to reach an expected state
+    pacing_file: str = DEFAULT_PACING_FILE  # JSON file of the rate limits of each action type
+    cycle_interval: float | None = None  # Minimum number of seconds between two cycles, overrides the pacing file
+    max_new: int | None = None  # Stop scrolling the modal after this many new newsletters, None to scroll to the end
+
+
+def load_config(file_name: str = DEFAULT_CONFIG_FILE) -> Config:
+    """
+    Read the configuration file, using the defaults for the settings it does not mention.
+
+    :param file_name: Path of the JSON file; the defaults are used if it does not exist
+    :return: Config
+    :raises ValueError: If the file contains an unknown setting
+    """
+    if not os.path.exists(file_name):
+        return Config()
+    with open(file_name, encoding="utf-8") as config_file:
+        settings = json.load(config_file)
+    unknown = sorted(set(settings) - set(Config._fields))
+    if unknown:
+        raise ValueError(f"Unknown settings in {file_name}: {', '.join(unknown)}")
+    print(f"Loaded configuration from {file_name}")
+    return Config(**settings)
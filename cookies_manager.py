@@ -1,40 +1,191 @@
 """
-This module provides functions to load and save cookies from/to a file.
+This module provides functions to load and save the LinkedIn session cookies and to log in with them.
+
+Cookies are stored as JSON together with the time they were saved. Their expiry is checked locally, so that stale
+cookies are not sent to the browser, and fresh ones are injected in a single CDP call before the first navigation.
+The pickle file used by earlier versions is read once and converted.
 """
+import json
 import os
 import pickle
+import threading
 import time
+from typing import Dict, List
 
+from selenium.common import WebDriverException
 from selenium.webdriver.chrome.webdriver import WebDriver
 
+from driver_manager import DriverManager, SESSION_COOKIE
+
+COOKIES_FILE = "linkedin_cookies.json"
+LEGACY_COOKIES_FILE = "linkedin_cookies.pkl"
+LINKEDIN_FEED_URL = "https://www.linkedin.com/feed/"
+LINKEDIN_LOGIN_URL = "https://www.linkedin.com/login"
+EXPIRY_MARGIN: float = 60 * 60  # Cookies expiring within this many seconds are considered stale
+
+# Serializes the logins of the browsers of the pipeline, so that only one of them prompts for a manual login at a time
+# and the others then log in with the cookies it saved
+_login_lock = threading.Lock()
+
+
+def migrate_legacy_cookies(file_name: str = COOKIES_FILE, legacy_file_name: str = LEGACY_COOKIES_FILE) -> None:
+    """
+    Convert the pickle file of earlier versions to the JSON store, if the store does not exist yet.
+
+    :param file_name: Path of the JSON store
+    :param legacy_file_name: Path of the pickle file
+    """
+    if os.path.exists(file_name) or not os.path.exists(legacy_file_name):
+        return
+    with open(file=legacy_file_name, mode="rb") as cookies_file:
+        cookies = pickle.load(file=cookies_file)
+    write_cookies(cookies=cookies, file_name=file_name, saved_at=os.path.getmtime(legacy_file_name))
+    print(f"Converted {legacy_file_name} to {file_name}")
+
+
+def read_cookies(file_name: str = COOKIES_FILE) -> List[Dict]:
+    """
+    Read the stored cookies.
+
+    :param file_name: Path of the JSON store
+    :return: List of cookies as returned by WebDriver.get_cookies(), empty if none were saved
+    """
+    migrate_legacy_cookies(file_name=file_name)
+    if not os.path.exists(file_name):
+        return []
+    with open(file_name, encoding="utf-8") as cookies_file:
+        return json.load(cookies_file)["cookies"]
+
+
+def write_cookies(cookies: List[Dict], file_name: str = COOKIES_FILE, saved_at: float | None = None) -> None:
+    """
+    Write cookies to the JSON store, replacing the file atomically.
+
+    :param cookies: List of cookies as returned by WebDriver.get_cookies()
+    :param file_name: Path of the JSON store
+    :param saved_at: Time the cookies were saved, defaults to now
+    """
+    session_cookie = next((cookie for cookie in cookies if cookie["name"] == SESSION_COOKIE), None)
+    record = {
+        "saved_at": saved_at if saved_at is not None else time.time(),
+        "session_expiry": session_cookie.get("expiry") if session_cookie else None,
+        "cookies": cookies,
+    }
+    temporary_file_name = f"{file_name}.tmp"
+    with open(temporary_file_name, "w", encoding="utf-8") as cookies_file:
+        json.dump(record, cookies_file, indent=2)
+    os.replace(temporary_file_name, file_name)
+
+
+def cookies_are_fresh(cookies: List[Dict], margin: float = EXPIRY_MARGIN) -> bool:
+    """
+    Check locally whether the stored session cookie can still log in.
+
+    :param cookies: List of stored cookies
+    :param margin: Number of seconds before its expiry at which the session cookie is considered stale
+    :return: True if the session cookie is present and does not expire within the margin
+    """
+    session_cookie = next((cookie for cookie in cookies if cookie["name"] == SESSION_COOKIE), None)
+    if session_cookie is None:
+        return False
+    return session_cookie.get("expiry", float("inf")) > time.time() + margin
+
+
+def _to_cdp_cookie(cookie: Dict) -> Dict:
+    """
+    Convert a cookie from the WebDriver format to the CDP Network.CookieParam format.
+
+    :param cookie: Cookie as returned by WebDriver.get_cookies()
+    :return: Cookie parameter of Network.setCookies
+    """
+    cdp_cookie = {
+        "name": cookie["name"],
+        "value": cookie["value"],
+        "domain": cookie.get("domain", ".linkedin.com"),
+        "path": cookie.get("path", "/"),
+        "secure": cookie.get("secure", False),
+        "httpOnly": cookie.get("httpOnly", False),
+    }
+    if "expiry" in cookie:
+        cdp_cookie["expires"] = cookie["expiry"]
+    if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+        cdp_cookie["sameSite"] = cookie["sameSite"]
+    return cdp_cookie
+
 
-def load_cookies(driver: WebDriver) -> None:
+def load_cookies(driver: WebDriver, cookies: List[Dict]) -> None:
     """
-    Load cookies from a file and add them to the WebDriver instance.
+    Add cookies to the browser, in a single CDP call when the driver supports it.
 
     :param driver: WebDriver instance
+    :param cookies: List of cookies as returned by WebDriver.get_cookies()
     """
-    if os.path.exists("linkedin_cookies.pkl"):
-        with open(file="linkedin_cookies.pkl", mode="rb") as cookies_file:
-            cookies = pickle.load(file=cookies_file)
-            for cookie in cookies:
-                driver.add_cookie(cookie_dict=cookie)
-        time.sleep(5)
-        driver.refresh()
+    try:
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": [_to_cdp_cookie(cookie) for cookie in cookies]})
+        return
+    except (AttributeError, WebDriverException) as e:
+        print(f"Could not inject the cookies through CDP, adding them one by one: {e}")
 
-        if "feed" not in driver.current_url:
-            print("Cookies expired, manual login required.")
-            driver.get(url="https://www.linkedin.com/login")
-    else:
-        print("No cookies found, manual login required.")
-        driver.get(url="https://www.linkedin.com/login")
+    # add_cookie only accepts cookies of the domain of the current page
+    if "linkedin.com" not in driver.current_url:
+        driver.get(url="https://www.linkedin.com/")
+    for cookie in cookies:
+        driver.add_cookie(cookie_dict=cookie)
 
 
-def save_cookies(driver: WebDriver) -> None:
+def save_cookies(driver: WebDriver, file_name: str = COOKIES_FILE) -> None:
     """
-    Save cookies to a pickle file.
+    Save the cookies of the browser to the JSON store.
 
     :param driver: WebDriver instance
+    :param file_name: Path of the JSON store
+    """
+    write_cookies(cookies=driver.get_cookies(), file_name=file_name)
+
+
+def login_with_cookies(driver_manager: DriverManager, cookies_file: str = COOKIES_FILE) -> None:
     """
-    with open(file="linkedin_cookies.pkl", mode="wb") as cookies_file:
-        pickle.dump(obj=driver.get_cookies(), file=cookies_file)
+    Log in to LinkedIn using cookies if available, otherwise prompt for manual login.
+    Nothing is done if the browser session is still logged in.
+
+    :param driver_manager: DriverManager owning the WebDriver session
+    :param cookies_file: Path of the JSON cookie store
+    """
+    start = time.monotonic()
+    driver: WebDriver = driver_manager.get_driver()
+    if driver_manager.has_valid_session():
+        print(f"Session still valid, skipping login (checked in {time.monotonic() - start:.2f}s)")
+        return
+
+    with _login_lock:
+        _login(driver_manager=driver_manager, driver=driver, cookies_file=cookies_file)
+    print(f"Login took {time.monotonic() - start:.2f}s")
+
+
+def _login(driver_manager: DriverManager, driver: WebDriver, cookies_file: str) -> None:
+    """
+    Log in with the stored cookies, prompting for a manual login if they are missing, stale or rejected.
+
+    :param driver_manager: DriverManager owning the WebDriver session
+    :param driver: WebDriver instance
+    :param cookies_file: Path of the JSON cookie store
+    """
+    try:
+        cookies = read_cookies(file_name=cookies_file)
+        if cookies_are_fresh(cookies):
+            load_cookies(driver=driver, cookies=cookies)
+            driver.get(url=LINKEDIN_FEED_URL)
+            if "feed" not in driver.current_url:
+                print("Cookies rejected, manual login required.")
+        elif cookies:
+            print("Cookies expired, manual login required.")
+        else:
+            print("No cookies found, manual login required.")
+
+        if "feed" not in driver.current_url:
+            driver.get(url=LINKEDIN_LOGIN_URL)
+            input("Please log in manually and complete 2FA, then press Enter...")
+            save_cookies(driver=driver, file_name=cookies_file)
+    except Exception as ex:
+        print(f"Login failed: {ex}")
+        driver_manager.quit()
@@ -0,0 +1,249 @@
+"""
+This module manages a long-lived Chrome WebDriver session that is reused across cycles.
+
+Chrome is launched with a persistent user-data directory so that the LinkedIn session survives restarts, dead
+sessions are detected and restarted, and navigation reuses a single working tab.
+
+By default the session is trimmed for scraping: images, media, fonts and trackers are blocked, pages are considered
+loaded once their DOM is ready, and the tab or the whole browser is recycled when Chrome uses too much memory.
+"""
+import os
+import time
+from typing import List
+
+from selenium import webdriver
+from selenium.common import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+from metrics import MEMORY_BUCKETS_MB, metrics, process_tree_rss
+
+DEFAULT_USER_DATA_DIR = "chrome_profile"
+SESSION_COOKIE = "li_at"  # LinkedIn authentication cookie
+MEMORY_LIMIT_MB: float = 1500  # Chrome memory above which the tab, then the browser, is recycled
+
+# Content settings of the profile, 2 blocking the content type: images are not downloaded, and camera and microphone
+# (media_stream), notification and location requests are denied without a prompt. No content setting covers video and
+# audio files; they are blocked by BLOCKED_URL_PATTERNS and kept from autoplaying by the autoplay policy instead.
+BLOCKED_CONTENT_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.media_stream": 2,
+    "profile.managed_default_content_settings.notifications": 2,
+    "profile.managed_default_content_settings.geolocation": 2,
+}
+
+# Requests blocked through CDP: media and fonts the bot never looks at, and third-party trackers
+BLOCKED_URL_PATTERNS: List[str] = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*media.licdn.com/dms/image*", "*dms.licdn.com/playlist*",
+    "*px.ads.linkedin.com*", "*doubleclick.net*", "*google-analytics.com*", "*googletagmanager.com*",
+    "*bat.bing.com*", "*connect.facebook.net*",
+]
+
+
+class DriverManager:
+    """
+    Owns the Chrome WebDriver session and restarts it when it dies.
+    """
+
+    def __init__(self, user_data_dir: str = DEFAULT_USER_DATA_DIR, headless: bool = False,
+                 trim_resources: bool = True, memory_limit_mb: float | None = MEMORY_LIMIT_MB) -> None:
+        """
+        :param user_data_dir: Directory where Chrome keeps the profile (cookies, local storage, cache)
+        :param headless: Run Chrome without a window
+        :param trim_resources: Block unneeded resources and use the eager page-load strategy
+        :param memory_limit_mb: Chrome memory above which the tab, then the browser, is recycled, None to never recycle
+        """
+        self.user_data_dir = os.path.abspath(user_data_dir)
+        self.headless = headless
+        self.trim_resources = trim_resources
+        self.memory_limit_mb = memory_limit_mb
+        self._driver: WebDriver | None = None
+        self.startup_seconds: float | None = None
+
+    def _options(self) -> Options:
+        options = Options()
+        options.add_argument(f"--user-data-dir={self.user_data_dir}")
+        options.add_argument("--no-first-run")
+        options.add_argument("--no-default-browser-check")
+        if self.headless:
+            options.add_argument("--headless=new")
+            options.add_argument("--window-size=1920,1080")
+        if self.trim_resources:
+            # Return from navigations once the DOM is ready, the bot waits for the elements it needs anyway
+            options.page_load_strategy = "eager"
+            options.add_experimental_option("prefs", BLOCKED_CONTENT_PREFS)
+            options.add_argument("--mute-audio")
+            options.add_argument("--autoplay-policy=user-gesture-required")
+        return options
+
+    def _block_urls(self) -> None:
+        """
+        Block the requests matching BLOCKED_URL_PATTERNS in the current tab through CDP.
+        """
+        if not self.trim_resources or self._driver is None:
+            return
+        try:
+            self._driver.execute_cdp_cmd("Network.enable", {})
+            self._driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        except WebDriverException as e:
+            print(f"Could not block unneeded requests: {e}")
+
+    def memory_mb(self) -> float:
+        """
+        Memory used by chromedriver and every Chrome process it started (Linux only, 0 elsewhere).
+
+        :return: Resident set size in MiB
+        """
+        if self._driver is None:
+            return 0.0
+        process = getattr(self._driver.service, "process", None)
+        if process is None:
+            return 0.0
+        return process_tree_rss(process.pid) / 2 ** 20
+
+    def recycle_tab(self) -> None:
+        """
+        Replace the working tab with a fresh one, releasing the memory held by the renderer of the old one.
+        """
+        driver = self._driver
+        old_tab = driver.current_window_handle
+        driver.switch_to.new_window("tab")
+        new_tab = driver.current_window_handle
+        driver.switch_to.window(window_name=old_tab)
+        driver.close()
+        driver.switch_to.window(window_name=new_tab)
+        self._block_urls()
+
+    def over_memory_limit(self) -> bool:
+        """
+        Sample the memory used by Chrome and compare it with the limit.
+
+        :return: True if a limit is set and Chrome uses more memory than it
+        """
+        if self.memory_limit_mb is None or self._driver is None:
+            return False
+        memory_mb = self.memory_mb()
+        metrics.observe("browser_memory_mb", memory_mb, buckets=MEMORY_BUCKETS_MB)
+        return memory_mb > self.memory_limit_mb
+
+    def recycle_if_needed(self) -> None:
+        """
+        Recycle the working tab when Chrome uses more memory than the limit, and restart the browser if that was not
+        enough. The caller must fetch the driver again with get_driver afterwards, as it may have been replaced.
+        """
+        if not self.over_memory_limit():
+            return
+
+        self.recycle_tab()
+        recycled_mb = self.memory_mb()
+        print(f"Chrome used more than {self.memory_limit_mb:.0f} MiB, {recycled_mb:.0f} MiB after recycling the tab")
+        metrics.increment("browser_recycles_total", scope="tab")
+        if recycled_mb > self.memory_limit_mb:
+            self.restart()
+            print(f"Restarted Chrome, now using {self.memory_mb():.0f} MiB")
+            metrics.increment("browser_recycles_total", scope="browser")
+
+    def start(self) -> WebDriver:
+        """
+        Launch Chrome.
+
+        :return: WebDriver instance
+        """
+        start = time.monotonic()
+        self._driver = webdriver.Chrome(options=self._options())
+        self.startup_seconds = time.monotonic() - start
+        print(f"Started Chrome in {self.startup_seconds:.2f}s (profile: {self.user_data_dir})")
+        metrics.observe("driver_startup_seconds", self.startup_seconds)
+        metrics.instrument_driver(self._driver)
+        self._block_urls()
+        return self._driver
+
+    def is_alive(self) -> bool:
+        """
+        Check whether the WebDriver session still responds.
+
+        :return: True if the session is usable
+        """
+        if self._driver is None:
+            return False
+        try:
+            self._driver.execute_script("return 1")
+            return True
+        except WebDriverException:
+            return False
+
+    def quit(self) -> None:
+        """
+        Close Chrome, ignoring errors from an already dead session.
+        """
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except WebDriverException:
+                pass
+            self._driver = None
+
+    def restart(self) -> WebDriver:
+        """
+        Quit the current session, if any, and launch a new one.
+
+        :return: WebDriver instance
+        """
+        self.quit()
+        return self.start()
+
+    def get_driver(self) -> WebDriver:
+        """
+        Return a healthy WebDriver session, starting or restarting Chrome if needed.
+
+        :return: WebDriver instance
+        """
+        start = time.monotonic()
+        if self._driver is None:
+            driver = self.start()
+        elif not self.is_alive():
+            print("WebDriver session is not responding, restarting Chrome...")
+            metrics.increment("driver_restarts_total")
+            driver = self.restart()
+        else:
+            print(f"Reusing WebDriver session (health check took {time.monotonic() - start:.2f}s)")
+            self.recycle_if_needed()
+            driver = self._driver
+        self.close_extra_tabs()
+        return driver
+
+    def close_extra_tabs(self) -> None:
+        """
+        Close every tab except the working tab so that navigation always happens in a single tab.
+        """
+        driver = self._driver
+        if driver is None:
+            return
+        working_tab, *extra_tabs = driver.window_handles
+        if not extra_tabs:
+            return
+        for handle in extra_tabs:
+            driver.switch_to.window(window_name=handle)
+            driver.close()
+        driver.switch_to.window(window_name=working_tab)
+
+    def has_valid_session(self) -> bool:
+        """
+        Check whether the browser is already logged in to LinkedIn, without navigating.
+
+        :return: True if the session cookie is present and not expired and the current page is not the login page
+        """
+        driver = self._driver
+        if driver is None:
+            return False
+        try:
+            current_url = driver.current_url
+            if "linkedin.com" not in current_url or "login" in current_url:
+                return False
+            cookie = driver.get_cookie(SESSION_COOKIE)
+        except WebDriverException:
+            return False
+        return cookie is not None and cookie.get("expiry", float("inf")) > time.time()
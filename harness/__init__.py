@@ -0,0 +1,3 @@
+"""
+Offline harness running the bot against a local stand-in for the LinkedIn pages.
+"""
@@ -0,0 +1,194 @@
+"""
+Local HTTP server standing in for the LinkedIn pages the bot drives.
+
+It serves snapshots of the "grow" page (sections loaded while scrolling, one of them with newsletters), the
+newsletter modal (cohort cards loaded page by page while scrolling) and a newsletter article with the share dropdown.
+Cards and articles embed images, like the real pages, so that blocking them can be measured. Reposts are recorded by
+the server so that a run can be checked afterwards.
+"""
+import json
+import os
+import random
+import struct
+import threading
+import time
+import zlib
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from urllib.parse import parse_qs, urlsplit
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+
+
+def make_png(width: int, height: int, seed: int = 0) -> bytes:
+    """
+    Encode an RGB image of random noise as PNG, which compresses poorly like a real photo.
+
+    :param width: Width in pixels
+    :param height: Height in pixels
+    :param seed: Seed of the noise
+    :return: PNG file contents
+    """
+    noise = random.Random(seed)
+    rows = b"".join(b"\x00" + noise.randbytes(width * 3) for _ in range(height))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)  # 8-bit RGB
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+def newsletter_slug(index: int) -> str:
+    """
+    Slug of the newsletter at the given position in the modal.
+
+    :param index: Position of the newsletter, starting at 0
+    :return: Slug used in the newsletter URL
+    """
+    return f"newsletter-{index}-{7000000000000000000 + index}"
+
+
+class FixtureServer:
+    """
+    Threaded HTTP server serving the LinkedIn stand-in pages.
+    """
+
+    def __init__(self, card_count: int = 100, page_size: int = 20, latency: float = 0.05,
+                 subscribed_every: int = 5, host: str = "127.0.0.1", port: int = 0) -> None:
+        """
+        :param card_count: Number of newsletter cards in the modal
+        :param page_size: Number of cards loaded per scroll step
+        :param latency: Number of seconds the pages take to load more content or react to a click
+        :param subscribed_every: Every n-th card is already subscribed to (0 to disable)
+        :param host: Interface to listen on
+        :param port: Port to listen on, 0 picks a free port
+        """
+        self.card_count = card_count
+        self.page_size = page_size
+        self.latency = latency
+        self.subscribed_every = subscribed_every
+        self.reposts: List[str] = []
+        self.image = make_png(256, 256)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        """
+        Address of the server, to be used in place of https://www.linkedin.com.
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def newsletter_urls(self) -> List[str]:
+        """
+        :return: URLs of all the newsletters in the modal
+        """
+        return [f"{self.base_url}/newsletters/{newsletter_slug(i)}/" for i in range(self.card_count)]
+
+    def is_subscribed(self, index: int) -> bool:
+        """
+        :param index: Position of the newsletter
+        :return: True if the newsletter is already subscribed to when the modal loads
+        """
+        return bool(self.subscribed_every) and index % self.subscribed_every == 0
+
+    def record_repost(self, slug: str) -> None:
+        """
+        :param slug: Slug of the reposted newsletter
+        """
+        with self._lock:
+            self.reposts.append(slug)
+
+    def start(self) -> "FixtureServer":
+        """
+        Start serving in a background thread.
+
+        :return: The started server
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop the server.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _handler_class(self) -> type:
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass  # Keep the output of the harness readable
+
+            def _send(self, body: bytes, content_type: str, status: HTTPStatus = HTTPStatus.OK) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_page(self, name: str) -> None:
+                with open(os.path.join(PAGES_DIR, name), encoding="utf-8") as page:
+                    html = page.read().replace("__LATENCY_MS__", str(int(fixture.latency * 1000)))
+                self._send(html.encode("utf-8"), "text/html; charset=utf-8")
+
+            def _send_json(self, payload: object) -> None:
+                self._send(json.dumps(payload).encode("utf-8"), "application/json")
+
+            def do_GET(self) -> None:
+                parts = urlsplit(self.path)
+                query = parse_qs(parts.query)
+                if parts.path in ("/", "/feed/"):
+                    self._send(b"<html><body><main>Feed</main></body></html>", "text/html")
+                elif parts.path == "/mynetwork/grow/":
+                    self._send_page("grow.html")
+                elif parts.path.startswith("/newsletters/"):
+                    self._send_page("article.html")
+                elif parts.path.startswith("/images/"):
+                    time.sleep(fixture.latency)
+                    self._send(fixture.image, "image/png")
+                elif parts.path == "/api/newsletters":
+                    offset = int(query.get("offset", ["0"])[0])
+                    limit = min(int(query.get("limit", [str(fixture.page_size)])[0]), fixture.page_size)
+                    time.sleep(fixture.latency)
+                    self._send_json([
+                        {"slug": newsletter_slug(i), "title": f"Newsletter {i}", "subscribed": fixture.is_subscribed(i)}
+                        for i in range(offset, min(offset + limit, fixture.card_count))
+                    ])
+                else:
+                    self._send(b"Not found", "text/plain", HTTPStatus.NOT_FOUND)
+
+            def do_POST(self) -> None:
+                parts = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length", "0"))
+                body = self.rfile.read(length).decode("utf-8")
+                if parts.path == "/api/reposts":
+                    fixture.record_repost(body)
+                    self._send_json({"ok": True})
+                else:
+                    self._send(b"Not found", "text/plain", HTTPStatus.NOT_FOUND)
+
+        return Handler
+
+
+if __name__ == "__main__":
+    with FixtureServer() as fixture_server:
+        print(f"Serving the LinkedIn stand-in at {fixture_server.base_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
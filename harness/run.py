@@ -0,0 +1,113 @@
+"""
+Offline harness driving headless Chrome against the local LinkedIn stand-in.
+
+It runs the subscription sweep and the sharing loop against the fixture server, checks their outcome and fails when
+a stage takes longer than its time budget, so that speed regressions can be caught without a network or an account.
+
+Run with `python -m harness.run`.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from typing import Callable, List, Tuple
+
+from driver_manager import DriverManager
+from harness.fixture_server import FixtureServer
+from internet_manager import connectivity
+from linkedin_scraper import subscribe_to_newsletters
+from newsletter_sharing import share_newsletters
+from scheduler import scheduler
+from utils import UrlIndex
+
+
+def check_subscribe(driver_manager: DriverManager, server: FixtureServer) -> str | None:
+    """
+    Subscribe to every newsletter of the modal and check that all unsubscribed cards were handled.
+
+    :param driver_manager: DriverManager owning the headless Chrome session
+    :param server: Running FixtureServer
+    :return: Error message, or None if the check passed
+    """
+    subscribed = subscribe_to_newsletters(driver=driver_manager.get_driver(), url_index=UrlIndex(),
+                                          base_url=server.base_url)
+    expected = [url for i, url in enumerate(server.newsletter_urls()) if not server.is_subscribed(i)]
+    if sorted(subscribed) != sorted(expected):
+        return f"subscribed to {len(subscribed)} newsletters, expected {len(expected)}"
+    return None
+
+
+def check_share(driver_manager: DriverManager, server: FixtureServer, share_count: int) -> str | None:
+    """
+    Repost newsletters and check that the server received every repost.
+
+    :param driver_manager: DriverManager owning the headless Chrome session
+    :param server: Running FixtureServer
+    :param share_count: Number of newsletters to repost
+    :return: Error message, or None if the check passed
+    """
+    urls = server.newsletter_urls()[:share_count]
+    erroneous_urls = share_newsletters(driver=driver_manager.get_driver(), newsletter_urls=urls)
+    if erroneous_urls:
+        return f"failed to share {len(erroneous_urls)} newsletters: {erroneous_urls}"
+    if len(server.reposts) != len(urls):
+        return f"server received {len(server.reposts)} reposts, expected {len(urls)}"
+    return None
+
+
+def run_harness(card_count: int, share_count: int, latency: float, subscribe_budget: float,
+                share_budget: float) -> List[Tuple[str, float, str | None]]:
+    """
+    Run every check against a fresh fixture server and headless Chrome session.
+
+    :param card_count: Number of newsletter cards in the modal
+    :param share_count: Number of newsletters to repost
+    :param latency: Response latency of the fixture pages in seconds
+    :param subscribe_budget: Maximum number of seconds allowed for the subscription sweep
+    :param share_budget: Maximum number of seconds allowed for the sharing loop
+    :return: List of (check name, elapsed seconds, error message or None)
+    """
+    checks: List[Tuple[str, float, Callable[[], str | None]]] = []
+    results: List[Tuple[str, float, str | None]] = []
+
+    with tempfile.TemporaryDirectory() as profile_dir, \
+            FixtureServer(card_count=card_count, latency=latency) as server:
+        connectivity.configure(probe_url=server.base_url)
+        driver_manager = DriverManager(user_data_dir=profile_dir, headless=True)
+        checks.append(("subscribe", subscribe_budget, lambda: check_subscribe(driver_manager, server)))
+        checks.append(("share", share_budget, lambda: check_share(driver_manager, server, share_count)))
+        try:
+            for name, budget, check in checks:
+                start = time.monotonic()
+                try:
+                    error = check()
+                except Exception as e:
+                    error = f"{e.__class__.__name__}: {e}"
+                elapsed = time.monotonic() - start
+                if error is None and elapsed > budget:
+                    error = f"took {elapsed:.2f}s, budget is {budget:.2f}s"
+                results.append((name, elapsed, error))
+        finally:
+            driver_manager.quit()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the bot against the local LinkedIn stand-in.")
+    parser.add_argument("--cards", type=int, default=100, help="Number of newsletter cards in the modal")
+    parser.add_argument("--shares", type=int, default=10, help="Number of newsletters to repost")
+    parser.add_argument("--latency", type=float, default=0.05, help="Response latency of the pages in seconds")
+    parser.add_argument("--subscribe-budget", type=float, default=60, help="Time budget of the subscription sweep")
+    parser.add_argument("--share-budget", type=float, default=30, help="Time budget of the sharing loop")
+    parser.add_argument("--keep-pacing", action="store_true",
+                        help="Keep the rate limits of the actions instead of measuring raw latency")
+    args = parser.parse_args()
+
+    if not args.keep_pacing:
+        scheduler.disable()
+
+    harness_results = run_harness(card_count=args.cards, share_count=args.shares, latency=args.latency,
+                                  subscribe_budget=args.subscribe_budget, share_budget=args.share_budget)
+    for check_name, check_elapsed, check_error in harness_results:
+        print(f"{check_name:<10} {check_elapsed:>8.2f}s  {'FAILED: ' + check_error if check_error else 'ok'}")
+    sys.exit(1 if any(check_error for _, _, check_error in harness_results) else 0)
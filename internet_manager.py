@@ -1,21 +1,171 @@
 """
-This module contains a function that checks for an active internet connection.
+This module keeps track of the internet connection with a background connectivity monitor.
+
+The monitor probes a URL through a pooled HTTP session, every few seconds while online and with an exponential
+backoff while offline, and caches the result. Callers check the cached state instantly or wait on an event until the
+connection is back, instead of making a fresh request on every failure.
 """
+import os
+import threading
 import time
 
 import requests
 
+DEFAULT_PROBE_URL = "https://www.google.com/"
+CHECK_INTERVAL: float = 30  # Seconds between two probes while online
+BACKOFF_BASE: float = 1  # Seconds before the first probe after going offline, doubled after each failed probe
+BACKOFF_MAX: float = 60
+PROBE_TIMEOUT: float = 5
+STOP_CHECK_INTERVAL: float = 1  # Seconds between two checks of the stop event while waiting for the connection
+
 
-def wait_for_internet() -> None:
+class ConnectivityMonitor:
     """
-    Check for an active internet connection by sending a request to Google.
-    If the connection is not available, wait for 30 seconds before trying again.
+    Background thread probing the internet connection and caching whether it is online.
     """
-    while True:
+
+    def __init__(self, probe_url: str = DEFAULT_PROBE_URL, check_interval: float = CHECK_INTERVAL,
+                 backoff_base: float = BACKOFF_BASE, backoff_max: float = BACKOFF_MAX,
+                 timeout: float = PROBE_TIMEOUT) -> None:
+        """
+        :param probe_url: URL requested to check the connection, any HTTP response counts as online
+        :param check_interval: Seconds between two probes while online
+        :param backoff_base: Seconds before the first probe after going offline, doubled after each failed probe
+        :param backoff_max: Maximum number of seconds between two probes while offline
+        :param timeout: Timeout of a probe in seconds
+        """
+        self.probe_url = probe_url
+        self.check_interval = check_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.online_since: float | None = None  # time.time() of the first successful probe since the last failure
+        self.session = requests.Session()  # Keeps the connection to the probe URL alive between probes
+        self._online = threading.Event()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def configure(self, probe_url: str) -> None:
+        """
+        Change the probe URL, e.g. to point at a local stand-in, and probe it again.
+
+        :param probe_url: URL requested to check the connection
+        """
+        self.probe_url = probe_url
+        self.recheck()
+
+    def probe(self) -> bool:
+        """
+        Request the probe URL once and update the cached state. Only the background thread calls it, as the pooled
+        session is not thread-safe; other threads ask for a probe with recheck.
+
+        :return: True if the probe URL answered
+        """
         try:
-            requests.get(url='https://www.google.com/', timeout=5)
-            print("Connected to the internet")
-            return
-        except requests.ConnectionError:
-            print("Waiting for internet connection...")
-            time.sleep(30)  # Wait for 30 seconds before trying again
+            self.session.head(self.probe_url, timeout=self.timeout, allow_redirects=False)
+            online = True
+        except requests.RequestException:
+            online = False
+
+        with self._lock:
+            if online and not self._online.is_set():
+                self.online_since = time.time()
+                self._online.set()
+                print("Connected to the internet")
+            elif not online and self._online.is_set():
+                self.online_since = None
+                self._online.clear()
+                print("Lost the internet connection")
+        return online
+
+    def _run(self) -> None:
+        """
+        Probe the connection until stopped, with an exponential backoff while offline.
+        """
+        delay = self.backoff_base
+        while not self._stop.is_set():
+            self._wake.clear()
+            if self.probe():
+                delay = self.backoff_base
+                wait = self.check_interval
+            else:
+                print("Waiting for internet connection...")
+                wait = delay
+                delay = min(delay * 2, self.backoff_max)
+            self._wake.wait(wait)
+
+    def start(self) -> None:
+        """
+        Start the background thread, if it is not running yet.
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="connectivity", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the background thread and close the session.
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.session.close()
+
+    def recheck(self) -> None:
+        """
+        Ask the background thread to probe now, without waiting for the result. Called after an action failed, so
+        that a lost connection is noticed before the next action rather than at the next scheduled probe.
+        """
+        self.start()
+        self._wake.set()
+
+    def is_online(self) -> bool:
+        """
+        Cached state of the connection, answered without any request.
+
+        :return: True if the last probe succeeded
+        """
+        return self._online.is_set()
+
+    def wait_until_online(self, timeout: float | None = None) -> bool:
+        """
+        Block until the connection is online, returning immediately if it already is.
+
+        :param timeout: Maximum number of seconds to wait, None to wait indefinitely
+        :return: True if online, False if the timeout expired first
+        """
+        self.start()
+        return self._online.wait(timeout)
+
+
+def _monitor_from_env() -> ConnectivityMonitor:
+    """
+    Create the shared monitor, with the probe URL taken from ``CONNECTIVITY_PROBE_URL`` if set.
+
+    :return: ConnectivityMonitor
+    """
+    return ConnectivityMonitor(probe_url=os.environ.get("CONNECTIVITY_PROBE_URL", DEFAULT_PROBE_URL))
+
+
+# Shared monitor: one background thread and one pooled session per process
+connectivity = _monitor_from_env()
+
+
+def wait_for_internet(stop_event: threading.Event | None = None) -> bool:
+    """
+    Wait for an active internet connection, returning immediately if the monitor last saw it online.
+
+    :param stop_event: Event that ends the wait when set, if given
+    :return: True once online, False if the stop event was set first
+    """
+    while not connectivity.wait_until_online(timeout=STOP_CHECK_INTERVAL):
+        if stop_event is not None and stop_event.is_set():
+            return False
+    return True
@@ -1,31 +1,47 @@
 """
 This module contains functions to scrape newsletters from LinkedIn and subscribe to them.
+
+Failed subscriptions are classified and retried at the end of the sweep with the backoff of their failure class, each
+retry locating the card again by its URL rather than reusing an element that may have gone stale.
 """
+import threading
 import time
-from traceback import print_exc
-from typing import List, Dict
+from typing import Callable, List, Dict, Iterator, NamedTuple, Set, TypeVar
 
-from selenium.common import NoSuchElementException, ElementClickInterceptedException, StaleElementReferenceException, \
-    WebDriverException
+from selenium.common import NoSuchElementException, TimeoutException
 from selenium.webdriver import Keys
 from selenium.webdriver.chrome.webdriver import WebDriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as ec
-from selenium.webdriver.support.wait import WebDriverWait
 
+from driver_manager import DriverManager
 from internet_manager import wait_for_internet
+from locators import locators
+from metrics import metrics
+from retries import FAILURE_GONE, FAILURE_MISSING_ELEMENT, Failure, SUBSCRIBE_POLICIES, classify_failure
+from scheduler import scheduler
+from waits import wait_until, wait_for_scroll_height_change, wait_for_dom_quiet
+from utils import NewsletterStore, UrlIndex
+
+T = TypeVar("T")
 
+LINKEDIN_BASE_URL = "https://www.linkedin.com"
+MEMORY_CHECK_INTERVAL: int = 10  # Batches of modal cards between two memory checks of the browser during a sweep
 
-def click_element(driver: WebDriver, element: WebElement) -> None:
+
+def click_element(driver: WebDriver, element: WebElement, action: str = "click",
+                  stop_event: threading.Event | None = None) -> None:
     """
     Clicks an element using JavaScript to avoid any overlay issues.
 
     :param driver: WebDriver instance
     :param element: WebElement to click
+    :param action: Action type whose rate limit applies to the click
+    :param stop_event: Event that cuts the pacing wait short when set, if given
     """
+    scheduler.acquire(action, cancel=stop_event)  # Stay within the rate limit to avoid overwhelming the page
     driver.execute_script("arguments[0].click();", element)
-    time.sleep(6)  # Slight delay to avoid overwhelming the page
 
 
 def find_subscribe_button(newsletter_card: WebElement) -> WebElement:
@@ -35,206 +51,485 @@ def find_subscribe_button(newsletter_card: WebElement) -> WebElement:
     :param newsletter_card: WebElement of the newsletter card
     :return: WebElement of the "Subscribe" button
     """
-    return newsletter_card.find_element(by=By.XPATH, value=".//div[@class='p3']//button")
+    return locators["subscribe_button"].find(newsletter_card)
+
+
+class NewsletterCard(NamedTuple):
+    """
+    Snapshot of a newsletter card extracted from the modal.
+    """
+    key: str  # Value of the data-scraper-key attribute used to locate the card again
+    url: str | None  # Address of the newsletter
+    button_label: str | None  # Text of the "Subscribe" button
+
+
+# Tags every card with a data-scraper-key attribute and returns [key, href, button label] for each of them,
+# or only for the cards that were not tagged yet if the second argument is true. The cards and their button are
+# located with the CSS selectors of the registry, given as the last two arguments, the button trying them in order.
+_EXTRACT_CARDS_SCRIPT = """
+const [modal, onlyNew, cardSelectors, buttonSelectors] = arguments;
+const cards = modal.querySelectorAll(cardSelectors.join(', '));
+const records = [];
+for (const card of cards) {
+    if (!card.dataset.scraperKey) {
+        window.__scraperCardCount = (window.__scraperCardCount || 0) + 1;
+        card.dataset.scraperKey = String(window.__scraperCardCount);
+    } else if (onlyNew) {
+        continue;
+    }
+    const link = card.querySelector('a');
+    const button = buttonSelectors.map(selector => card.querySelector(selector)).find(Boolean);
+    records.push([card.dataset.scraperKey, link ? link.href : null, button ? button.innerText.trim() : null]);
+}
+return records;
+"""
+
+
+def extract_newsletter_cards(driver: WebDriver, modal: WebElement, only_new: bool = False) -> List[NewsletterCard]:
+    """
+    Extract the URL and button label of every newsletter card in the modal with a single script call.
+
+    :param driver: WebDriver instance
+    :param modal: WebElement of the modal
+    :param only_new: Only extract the cards that were not extracted by a previous call
+    :return: List of NewsletterCard records
+    """
+    records = driver.execute_script(_EXTRACT_CARDS_SCRIPT, modal, only_new, locators["newsletter_card"].css_selectors(),
+                                    locators["subscribe_button"].css_selectors())
+    return [NewsletterCard(*record) for record in records]
+
+
+def find_newsletter_card(modal: WebElement, card: NewsletterCard) -> WebElement:
+    """
+    Locate the WebElement of an extracted newsletter card.
+
+    :param modal: WebElement of the modal
+    :param card: NewsletterCard record
+    :return: WebElement of the newsletter card
+    """
+    return modal.find_element(by=By.CSS_SELECTOR, value=f'[data-scraper-key="{card.key}"]')
+
+
+# Returns the newsletter card of the modal given as first argument that links to the URL given as second argument,
+# or null if the modal no longer lists it. The cards are located with the CSS selectors given as third argument.
+_FIND_CARD_BY_URL_SCRIPT = """
+const [modal, url, cardSelectors] = arguments;
+for (const card of modal.querySelectorAll(cardSelectors.join(', '))) {
+    const link = card.querySelector('a');
+    if (link && link.href === url) {
+        return card;
+    }
+}
+return null;
+"""
+
+
+def find_card_by_url(driver: WebDriver, modal: WebElement, url: str) -> WebElement | None:
+    """
+    Locate the newsletter card linking to a URL with a single script call.
+
+    :param driver: WebDriver instance
+    :param modal: WebElement of the modal
+    :param url: Newsletter URL
+    :return: WebElement of the newsletter card, or None if the modal no longer lists it
+    """
+    return driver.execute_script(_FIND_CARD_BY_URL_SCRIPT, modal, url, locators["newsletter_card"].css_selectors())
+
+
+def wait_for_subscribed(driver: WebDriver, newsletter_card: WebElement, timeout: float = 6) -> bool:
+    """
+    Wait until the "Subscribe" button of a newsletter card turns into "Subscribed".
+
+    :param driver: WebDriver instance
+    :param newsletter_card: WebElement of the newsletter card
+    :param timeout: Maximum number of seconds to wait
+    :return: True if the subscription was confirmed within the timeout
+    """
+    try:
+        return wait_until(driver, lambda _: find_subscribe_button(newsletter_card).text == "Subscribed",
+                          description="subscription confirmation", timeout=timeout)
+    except TimeoutException:
+        return False
+
+
+class NewsletterSection(NamedTuple):
+    """
+    Section of the "grow" page listing newsletters.
+    """
+    section: WebElement
+    see_all_button: WebElement | None  # None if none of the CSS selectors of the button matched
+
+
+# Looks for the first section containing a control matched by the CSS selector given as first argument, among the
+# sections not examined by a previous call. Sections are tagged with a data-scraper-seen attribute once they are
+# rendered, i.e. contain a button, so that a section whose controls are still hydrating is examined again. Returns
+# [section, button], the button being the first match of the CSS selectors given as second argument, tried in order,
+# or null; returns null if no new section lists newsletters.
+_FIND_SECTION_SCRIPT = """
+const [selector, buttonSelectors] = arguments;
+for (const section of document.querySelectorAll('section:not([data-scraper-seen])')) {
+    if (section.querySelector(selector)) {
+        const button = buttonSelectors.map(buttonSelector => section.querySelector(buttonSelector)).find(Boolean);
+        return [section, button || null];
+    }
+    if (section.querySelector('button')) {
+        section.dataset.scraperSeen = '1';
+    }
+}
+return null;
+"""
 
 
-def scroll_to_bottom(driver: WebDriver, wait: WebDriverWait) -> None:
+def find_newsletter_section(driver: WebDriver) -> NewsletterSection | None:
     """
-    Scroll to the bottom of the page to load all the content.
+    Find the section of the page listing newsletters and its "See all" button with a single script call, examining
+    only the sections that were not fully rendered at the previous call.
 
     :param driver: WebDriver instance
-    :param wait: WebDriverWait instance for waiting for elements to load
+    :return: NewsletterSection, or None if none of the new sections lists newsletters
     """
-    scroll_section = driver.find_element(by=By.XPATH, value="//*[@tabindex='-1']")
+    selector = ", ".join(locators["newsletter_marker"].css_selectors())
+    found = driver.execute_script(_FIND_SECTION_SCRIPT, selector, locators["see_all_button"].css_selectors())
+    return NewsletterSection(*found) if found else None
+
+
+def scroll_to_bottom(driver: WebDriver,
+                     stop_condition: Callable[[WebDriver], T | None] = find_newsletter_section,
+                     stop_event: threading.Event | None = None) -> T | None:
+    """
+    Scroll down the page to load its content, until the stop condition finds its target or the bottom is reached.
+
+    :param driver: WebDriver instance
+    :param stop_condition: Callable taking the driver and returning the target, or None to keep scrolling
+    :param stop_event: Event that cuts the pacing waits short when set, if given
+    :return: Target returned by the stop condition, or None if the bottom was reached without finding it
+    """
+    scroll_section = wait_until(driver, ec.presence_of_element_located((By.XPATH, "//*[@tabindex='-1']")),
+                                description="scrollable page section")
     last_height = driver.execute_script("return arguments[0].scrollHeight", scroll_section)
 
     while True:
-        time.sleep(5)
+        # Check the content loaded so far before scrolling further
+        target = stop_condition(driver)
+        if target is not None:
+            return target
+
+        scheduler.acquire("scroll", cancel=stop_event)
         # Scroll to the bottom of the page
         driver.execute_script("arguments[0].scrollTo(0, arguments[0].scrollHeight)", scroll_section)
-        time.sleep(2)  # Wait for content to load
 
-        # Calculate new scroll height
-        new_height = driver.execute_script("return arguments[0].scrollHeight", scroll_section)
+        # Wait for content to load and calculate new scroll height
+        new_height = wait_for_scroll_height_change(driver, scroll_section, last_height)
         if new_height == last_height:
             break
         last_height = new_height
 
-        try:
-            # Locate all divs with the class 'discover-sections-list__item'
-            sections = wait.until(
-                ec.visibility_of_all_elements_located((By.TAG_NAME, "section"))
-            )
-
-            for section in sections:
-                # Check if the section contains a "Subscribe" button
-                try:
-                    if section.find_element(by=By.XPATH, value=".//*[contains(@aria-label, 'Subscribe to')]"):
-                        # Scroll to the section and locate the "See all" button (usually the first button in the section)
-                        see_all_button = section.find_element(by=By.TAG_NAME, value="button")
-
-                        # Click the "See all" button using JS to avoid any overlay issues
-                        click_element(driver, see_all_button)
-                        print("Clicked 'See all' button for the section containing 'Subscribe'")
-                        return  # Found the section, no need to check further
-                except NoSuchElementException:
-                    print("No 'Subscribe' button found in this section")
+    print("Scrolled to the bottom of the page.")
+    # Let the last sections finish rendering before the final check
+    wait_for_dom_quiet(driver, scroll_section)
+    return stop_condition(driver)
 
-        except Exception as e:
-            print('Exception of Type: ', e.__class__.__name__)
-            print_exc()
 
-    print("Scrolled to the bottom of the page.")
+def record_subscription_attempt(store: NewsletterStore | None, url: str, outcome: str,
+                                failure: Failure | None = None) -> None:
+    """
+    Record a subscription attempt in the ledger, if a store is given.
+
+    :param store: NewsletterStore of the ledger, or None
+    :param url: Newsletter URL
+    :param outcome: "subscribed", "failed" or "given_up"
+    :param failure: Classified failure, if the attempt failed
+    """
+    if store is not None:
+        store.record_attempt(url=url, action="subscribe", outcome=outcome,
+                             failure_class=failure.failure_class if failure else None,
+                             detail=failure.detail if failure else None)
 
 
-def handle_subscription(driver: WebDriver, newsletter_card: WebElement, existing_urls: List[str],
-                        subscribed_newsletters: List[str], failed_attempts: Dict[str, WebElement]) -> None:
+def handle_subscription(driver: WebDriver, modal: WebElement, card: NewsletterCard, url_index: UrlIndex,
+                        subscribed_newsletters: List[str], failed_attempts: Dict[str, Failure],
+                        store: NewsletterStore | None = None, stop_event: threading.Event | None = None) -> None:
     """
     Handles the subscription process for a single newsletter card.
 
     :param driver: WebDriver instance
-    :param newsletter_card: WebElement of the newsletter card
-    :param existing_urls: List of existing newsletter URLs
-    :param subscribed_newsletters: List of subscribed newsletter URLs
-    :param failed_attempts: Dictionary of failed attempts with URLs and WebElements
+    :param modal: WebElement of the modal containing the card
+    :param card: NewsletterCard record extracted from the modal
+    :param url_index: UrlIndex of the newsletter URLs that are already in the ledger or were subscribed to
+    :param subscribed_newsletters: List of newsletter URLs subscribed to in this run
+    :param failed_attempts: Dictionary of the classified failures by newsletter URL, to retry later
+    :param store: NewsletterStore where the attempt is recorded, if given
+    :param stop_event: Event that ends the waits for the connection and the pacing when set, if given
     """
-    newsletter_url: str | None = None
-    subscribe_button: WebElement | None = None
+    newsletter_url: str | None = card.url
+    failure: Failure | None = None
     try:
-        # Get the address of the newsletter and check if it has already been subscribed to
-        newsletter_url = newsletter_card.find_element(by=By.TAG_NAME, value="a").get_attribute("href")
-        if newsletter_url and (newsletter_url in existing_urls or newsletter_url in subscribed_newsletters):
+        # Check if the newsletter has already been subscribed to
+        if newsletter_url and newsletter_url in url_index:
             print(f"Already subscribed to: {newsletter_url}")
+            metrics.increment("subscriptions_total", outcome="already_subscribed")
             return
 
+        if card.button_label is None:
+            # None of the selectors of the button matched, retried in case the card was still rendering
+            failure = Failure(FAILURE_MISSING_ELEMENT, "No subscribe button in the card")
+
         # Click the "Subscribe" button
-        subscribe_button = find_subscribe_button(newsletter_card)
-        if subscribe_button.text == "Subscribe":
-            click_element(driver, subscribe_button)
+        elif card.button_label == "Subscribe":
+            newsletter_card = find_newsletter_card(modal, card)
+            subscribe_button = find_subscribe_button(newsletter_card)
+            if not wait_for_internet(stop_event):
+                return  # Stopping while offline, the card is examined again by the next sweep
+            click_element(driver, subscribe_button, action="subscribe", stop_event=stop_event)
 
             # Check if the subscription was successful
-            subscribed_button = find_subscribe_button(newsletter_card)
-            if subscribed_button.text == "Subscribed":
+            if wait_for_subscribed(driver, newsletter_card):
+                url_index.add(newsletter_url)
                 subscribed_newsletters.append(newsletter_url)
                 print(f"Subscribed and scraped: {newsletter_url}")
-            else:
-                # Subscription failed, retry later (could be due to network issues)
-                print(f"Failed to subscribe to newsletter: {newsletter_url}")
-                wait_for_internet()
-                failed_attempts[newsletter_url] = subscribe_button
-    except (
-            NoSuchElementException, ElementClickInterceptedException, StaleElementReferenceException,
-            WebDriverException) as e:
-        print(f"Error occurred for {newsletter_url}: {e}")
-        wait_for_internet()
-        failed_attempts[newsletter_url] = subscribe_button
+                metrics.increment("subscriptions_total", outcome="subscribed")
+                record_subscription_attempt(store, newsletter_url, "subscribed")
+                return
+            # Subscription failed, retry later (could be due to network issues)
+            failure = classify_failure(TimeoutException("Subscription not confirmed"))
     except Exception as e:
-        print(f"Failed to subscribe to newsletter: {e}")
+        failure = classify_failure(e)
 
+    if failure is not None and newsletter_url:
+        print(f"Failed to subscribe to newsletter {newsletter_url} ({failure.failure_class}): {failure.detail}")
+        metrics.increment("subscriptions_total", outcome="failed", error=failure.failure_class)
+        record_subscription_attempt(store, newsletter_url, "failed", failure)
+        failed_attempts[newsletter_url] = failure
 
-def subscribe_to_newsletters(driver: WebDriver, existing_urls: List[str]) -> List[str]:
+
+def retry_failed_subscriptions(driver: WebDriver, modal: WebElement, url_index: UrlIndex,
+                               subscribed_newsletters: List[str], failed_attempts: Dict[str, Failure],
+                               store: NewsletterStore | None = None,
+                               stop_event: threading.Event | None = None) -> None:
     """
-    Subscribe to newsletters on LinkedIn and scrape their URLs.
+    Retry the failed subscriptions, each after the backoff of its failure class, until they succeed or their retry
+    policy gives them up. Permanent failures are given up without retrying.
 
     :param driver: WebDriver instance
-    :param existing_urls: List of existing newsletter URLs
-    :return: List of subscribed newsletter URLs
+    :param modal: WebElement of the modal
+    :param url_index: UrlIndex of the newsletter URLs that are already in the ledger or were subscribed to
+    :param subscribed_newsletters: List of newsletter URLs subscribed to in this run
+    :param failed_attempts: Dictionary of the classified failures by newsletter URL, emptied as they are resolved
+    :param store: NewsletterStore where the attempts are recorded, if given
+    :param stop_event: Event that ends the retries, including their backoff and connection waits, when set, if given
     """
-    driver.get(url="https://www.linkedin.com/mynetwork/grow/")
+    attempts: Dict[str, int] = {url: 1 for url in failed_attempts}
+    next_attempt_at: Dict[str, float] = {
+        url: time.monotonic() + SUBSCRIBE_POLICIES[failure.failure_class].delay(1)
+        for url, failure in failed_attempts.items()}
+
+    while failed_attempts:
+        for newsletter_url, failure in list(failed_attempts.items()):
+            if attempts[newsletter_url] >= SUBSCRIBE_POLICIES[failure.failure_class].max_attempts:
+                print(f"Giving up on subscribing to {newsletter_url} after {attempts[newsletter_url]} attempts "
+                      f"({failure.failure_class})")
+                metrics.increment("subscriptions_total", outcome="gave_up", error=failure.failure_class)
+                record_subscription_attempt(store, newsletter_url, "given_up", failure)
+                del failed_attempts[newsletter_url]
+        if not failed_attempts or (stop_event is not None and stop_event.is_set()):
+            break
 
-    # Wait for the page to load
-    wait: WebDriverWait = WebDriverWait(driver, timeout=10)
+        # Retry the newsletter whose backoff ends first
+        newsletter_url = min(failed_attempts, key=next_attempt_at.__getitem__)
+        delay = next_attempt_at[newsletter_url] - time.monotonic()
+        if delay > 0:
+            if stop_event is None:
+                time.sleep(delay)
+            elif stop_event.wait(delay):
+                break
+        if not wait_for_internet(stop_event):
+            break
+        failure = failed_attempts.pop(newsletter_url)
+        metrics.increment("subscriptions_total", outcome="retried", error=failure.failure_class)
+        try:
+            # Locate the card again, the element found by the previous attempt may be stale
+            newsletter_card = find_card_by_url(driver, modal, newsletter_url)
+            if newsletter_card is None:
+                failure = Failure(FAILURE_GONE, "No longer listed in the modal")
+            else:
+                subscribe_button = find_subscribe_button(newsletter_card)
+                # A click whose confirmation timed out may still have gone through
+                already_subscribed = subscribe_button.text == "Subscribed"
+                if not already_subscribed:
+                    click_element(driver, subscribe_button, action="subscribe", stop_event=stop_event)
+                if already_subscribed or wait_for_subscribed(driver, newsletter_card):
+                    if url_index.add(newsletter_url):
+                        subscribed_newsletters.append(newsletter_url)
+                    print(f"Subscribed and scraped on retry: {newsletter_url}")
+                    metrics.increment("subscriptions_total", outcome="subscribed")
+                    record_subscription_attempt(store, newsletter_url, "subscribed")
+                    continue
+                failure = classify_failure(TimeoutException("Subscription not confirmed"))
+        except Exception as e:
+            failure = classify_failure(e)
 
-    # Scroll to the bottom of the page to load all the sections
-    scroll_to_bottom(driver, wait)
+        print(f"Retry failed for {newsletter_url} ({failure.failure_class}): {failure.detail}")
+        record_subscription_attempt(store, newsletter_url, "failed", failure)
+        attempts[newsletter_url] += 1
+        next_attempt_at[newsletter_url] = \
+            time.monotonic() + SUBSCRIBE_POLICIES[failure.failure_class].delay(attempts[newsletter_url])
+        failed_attempts[newsletter_url] = failure
 
-    subscribed_newsletters: List[str] = []
-    failed_attempts: Dict[str, WebElement] = {}
 
-    # Wait for the modal to appear
-    dialog_box: WebElement = driver.find_elements(by=By.TAG_NAME, value="dialog")[-1]
+def open_newsletter_modal(driver: WebDriver, base_url: str = LINKEDIN_BASE_URL,
+                          stop_event: threading.Event | None = None) -> WebElement:
+    """
+    Open the "grow" page, find the newsletters section and open its "See all" modal.
 
-    div_elements_in_dialog: List[WebElement] = dialog_box.find_elements(By.TAG_NAME, "div")
+    :param driver: WebDriver instance
+    :param base_url: Address of the LinkedIn site, can point to a local stand-in
+    :param stop_event: Event that cuts the pacing waits short when set, if given
+    :return: WebElement of the scrollable list of newsletters in the modal
+    """
+    scheduler.acquire("navigate", cancel=stop_event)
+    driver.get(url=f"{base_url}/mynetwork/grow/")
 
-    modal: WebElement | None = None
+    # Scroll down the page until the newsletters section is loaded
+    newsletter_section = scroll_to_bottom(driver, stop_event=stop_event)
+    if newsletter_section is None:
+        raise NoSuchElementException("No section of the page lists newsletters")
 
-    for element in div_elements_in_dialog:
-        # Check if the element is scrollable by comparing scrollHeight and clientHeight
-        is_scrollable: bool = driver.execute_script("return arguments[0].scrollHeight > arguments[0].clientHeight;", element)
-        if is_scrollable:
-            modal = element  # Store the first scrollable element in 'modal'
-            break
+    # Open the modal with the "See all" button of the section, using JS to avoid any overlay issues; the selectors that
+    # CSS cannot express are only tried if the script found no button
+    see_all_button = newsletter_section.see_all_button or locators["see_all_button"].find(newsletter_section.section)
+    click_element(driver, see_all_button, stop_event=stop_event)
+    print("Clicked 'See all' button for the section containing 'Subscribe'")
 
-    # Scroll to the bottom of the modal to load all newsletters
-    scroll_to_bottom_of_modal(driver, modal)
+    # Wait for the modal to appear
+    dialog_box: WebElement = wait_until(driver, ec.presence_of_all_elements_located((By.TAG_NAME, "dialog")),
+                                        description="newsletter modal")[-1]
+
+    # Wait for the first scrollable div in the dialog, found by comparing scrollHeight and clientHeight
+    return wait_until(
+        driver,
+        lambda d: d.execute_script(
+            "return [...arguments[0].querySelectorAll('div')].find(div => div.scrollHeight > div.clientHeight) || null;",
+            dialog_box),
+        description="scrollable newsletter list")
+
+
+def subscribe_to_newsletters(driver: WebDriver, url_index: UrlIndex, max_new: int | None = None,
+                             base_url: str = LINKEDIN_BASE_URL, on_subscribed: Callable[[str], None] | None = None,
+                             stop_event: threading.Event | None = None,
+                             store: NewsletterStore | None = None,
+                             driver_manager: DriverManager | None = None) -> List[str]:
+    """
+    Subscribe to newsletters on LinkedIn and scrape their URLs.
 
-    # Once all newsletters are loaded, find all the newsletter cards in the modal
-    newsletter_cards = modal.find_elements(by=By.CSS_SELECTOR, value='[data-view-name="cohort-card"]')
+    The modal cannot survive a recycled tab, so when Chrome goes over its memory limit while scrolling it the sweep
+    ends early; the next get_driver of the caller recycles the tab, and the next sweep picks up the remaining cards.
 
-    for newsletter_card in newsletter_cards:
-        handle_subscription(driver, newsletter_card, existing_urls, subscribed_newsletters, failed_attempts)
+    :param driver: WebDriver instance
+    :param url_index: UrlIndex of the newsletter URLs already in the ledger, updated with new subscriptions
+    :param max_new: Stop scrolling the modal once this many unsubscribed newsletters were found, if given
+    :param base_url: Address of the LinkedIn site, can point to a local stand-in
+    :param on_subscribed: Called with each newsletter URL as soon as it is subscribed to, if given
+    :param stop_event: Checked after each batch of cards, the sweep and its waits stop early once it is set, if given
+    :param store: NewsletterStore where every subscription attempt and its outcome are recorded, if given
+    :param driver_manager: DriverManager owning the driver, whose memory is checked every MEMORY_CHECK_INTERVAL
+        batches of cards, if given
+    :return: List of subscribed newsletter URLs
+    """
+    modal: WebElement = open_newsletter_modal(driver, base_url, stop_event)
 
-    # Verify if failed newsletters were subscribed to
+    subscribed_newsletters: List[str] = []
+    failed_attempts: Dict[str, Failure] = {}
+    reported: int = 0
+
+    def report_subscribed() -> None:
+        nonlocal reported
+        if on_subscribed is not None:
+            for newsletter_url in subscribed_newsletters[reported:]:
+                on_subscribed(newsletter_url)
+        reported = len(subscribed_newsletters)
+
+    # Scroll through the modal and subscribe to the newsletters as soon as their cards are loaded
+    new_found: int = 0
+    modal_cards = iter_modal_cards(driver, modal, stop_event)
+    for batch, newsletter_cards in enumerate(modal_cards, start=1):
+        for newsletter_card in newsletter_cards:
+            newsletter_url = newsletter_card.url
+            if newsletter_card.button_label == "Subscribe" and newsletter_url and newsletter_url not in url_index:
+                new_found += 1
+            handle_subscription(driver, modal, newsletter_card, url_index, subscribed_newsletters, failed_attempts,
+                                store, stop_event)
+            report_subscribed()
+        if max_new is not None and new_found >= max_new:
+            print(f"Found {new_found} new newsletters, stopping early.")
+            modal_cards.close()
+            break
+        if driver_manager is not None and batch % MEMORY_CHECK_INTERVAL == 0 and driver_manager.over_memory_limit():
+            print("Chrome is over its memory limit, ending the sweep until the tab is recycled.")
+            modal_cards.close()
+            break
+        if stop_event is not None and stop_event.is_set():
+            print("Stop requested, ending the subscription sweep.")
+            modal_cards.close()
+            return subscribed_newsletters
+
+    # Retry the failed subscriptions with the backoff of their failure class
     if failed_attempts:
-        print(f"Failed to subscribe to {len(failed_attempts)} newsletters. Retrying up to 3 times...")
-        retry_count: int = 3
-        for _ in range(retry_count):
-            if not failed_attempts:
-                break
-            current_failed_attempts: Dict[str, WebElement] = failed_attempts.copy()
-            failed_attempts.clear()
-            for newsletter_url, subscribe_button in current_failed_attempts.items():
-                try:
-                    click_element(driver, subscribe_button)
-
-                    # Check if the subscription was successful
-                    subscribed_button = find_subscribe_button(subscribe_button.find_element(By.XPATH, ".."))
-                    if subscribed_button.text == "Subscribed":
-                        subscribed_newsletters.append(newsletter_url)
-                        print(f"Subscribed and scraped on retry: {newsletter_url}")
-                    else:
-                        print(f"Failed to subscribe to newsletter: {newsletter_url}")
-                        wait_for_internet()
-                        failed_attempts[newsletter_url] = subscribe_button
-                except StaleElementReferenceException:
-                    print("Already subscribed to newsletter...")
-                    subscribed_newsletters.append(
-                        newsletter_url) if newsletter_url not in subscribed_newsletters else None
-                except (NoSuchElementException, ElementClickInterceptedException, WebDriverException) as e:
-                    print(f"Retry failed for {newsletter_url}: {e}")
-                    wait_for_internet()  # Wait for internet connectivity
-                    failed_attempts[newsletter_url] = subscribe_button
-                except Exception as e:
-                    print(f"Failed to subscribe to newsletter: {newsletter_url}, on retry: {e}")
-                    failed_attempts[newsletter_url] = subscribe_button
-
-        if failed_attempts:
-            print(f"Failed to subscribe to the following newsletters after {retry_count} attempts:")
-            for newsletter_url in failed_attempts.keys():
-                print(newsletter_url)
+        print(f"Failed to subscribe to {len(failed_attempts)} newsletters, retrying them...")
+        retry_failed_subscriptions(driver, modal, url_index, subscribed_newsletters, failed_attempts, store,
+                                   stop_event)
+        report_subscribed()
 
     return subscribed_newsletters
 
 
-def scroll_to_bottom_of_modal(driver: WebDriver, modal: WebElement) -> None:
+def iter_modal_cards(driver: WebDriver, modal: WebElement,
+                     stop_event: threading.Event | None = None) -> Iterator[List[NewsletterCard]]:
     """
-    Scroll to the bottom of the modal to load all the content.
+    Scroll the modal step by step and yield the newsletter cards that appeared after each step.
+
+    The caller can act on the cards as soon as they are loaded and stop scrolling early by closing the generator.
 
     :param driver: WebDriver instance
     :param modal: WebElement of the modal
+    :param stop_event: Event that cuts the pacing waits short when set, if given
+    :return: Iterator of lists of newly loaded NewsletterCard records
     """
-    # Get the initial scroll height
+    seen_keys: Set[str] = set()
     last_height = driver.execute_script("return arguments[0].scrollHeight", modal)
+    reached_bottom = False
 
     while True:
+        # Harvest the cards loaded since the previous step
+        new_cards = [card for card in extract_newsletter_cards(driver, modal, only_new=True)
+                     if card.key not in seen_keys]
+        seen_keys.update(card.key for card in new_cards)
+        if new_cards:
+            yield new_cards
+
+        if reached_bottom:
+            break
+
         # Scroll to the bottom of the modal
+        scheduler.acquire("scroll", cancel=stop_event)
         modal.send_keys(Keys.END)
-        time.sleep(6)  # Wait for content to load
 
-        # Calculate new scroll height
-        new_height = driver.execute_script("return arguments[0].scrollHeight", modal)
-        time.sleep(4)
+        # Wait for content to load and calculate new scroll height
+        new_height = wait_for_scroll_height_change(driver, modal, last_height)
         if new_height == last_height:
-            break
+            # Lazy loading can lag behind the scroll event, give the list a last chance to grow once it has settled
+            wait_for_dom_quiet(driver, modal)
+            new_height = driver.execute_script("return arguments[0].scrollHeight", modal)
+        reached_bottom = new_height == last_height
         last_height = new_height
     print("Scrolled to the bottom of the modal.")
+
+
+def scroll_to_bottom_of_modal(driver: WebDriver, modal: WebElement) -> None:
+    """
+    Scroll to the bottom of the modal to load all the content.
+
+    :param driver: WebDriver instance
+    :param modal: WebElement of the modal
+    """
+    for _ in iter_modal_cards(driver, modal):
+        pass
@@ -0,0 +1,279 @@
+"""
+This module contains the registry of the locators of the LinkedIn controls the bot interacts with.
+
+Each control has an ordered chain of selectors, cheapest and most specific first, with broader fallbacks for when
+LinkedIn changes its markup. The selector that last found the control is tried first on the next lookup, and waits poll
+only that selector until they time out. The hits, misses and lookup time of every selector are recorded once per lookup
+or wait, so that dead selectors can be spotted and removed.
+"""
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from selenium.common import NoSuchElementException, StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+
+from metrics import metrics
+from waits import wait_until
+
+FALLBACK_TIMEOUT: float = 2  # Seconds the rest of the chain is polled for once the preferred selector timed out
+
+
+class Selector(NamedTuple):
+    """
+    Selenium locator strategy and value.
+    """
+    by: str
+    value: str
+
+
+class LocatorChain:
+    """
+    Ordered selectors of one control, remembering which one matched last.
+    """
+
+    def __init__(self, name: str, selectors: List[Selector]) -> None:
+        """
+        :param name: Name of the control
+        :param selectors: Selectors to try in order
+        """
+        self.name = name
+        self.selectors = selectors
+        self.preferred = 0  # Index of the selector that matched last
+        self.hits = [0] * len(selectors)
+        self.misses = [0] * len(selectors)  # Selector tried without matching
+        self.lookup_seconds = [0.0] * len(selectors)  # Total time of the lookups the selector answered
+        self.miss_seconds = [0.0] * len(selectors)  # Total time spent trying the selector without a match
+        self._lock = threading.Lock()
+
+    def _order(self) -> List[int]:
+        """
+        :return: Indexes of the selectors, the preferred one first
+        """
+        preferred = self.preferred
+        return [preferred] + [i for i in range(len(self.selectors)) if i != preferred]
+
+    def find(self, context: object) -> WebElement:
+        """
+        Find the control, trying the preferred selector first.
+
+        :param context: WebDriver or WebElement to search in
+        :return: WebElement of the control
+        :raises NoSuchElementException: If no selector matches
+        """
+        start = time.monotonic()
+        tried: List[Tuple[int, float]] = []
+        for index in self._order():
+            selector = self.selectors[index]
+            attempt_start = time.monotonic()
+            try:
+                element = context.find_element(by=selector.by, value=selector.value)
+            except NoSuchElementException:
+                tried.append((index, time.monotonic() - attempt_start))
+                continue
+            self._record(index, tried, time.monotonic() - start)
+            return element
+        self._record(None, tried, time.monotonic() - start)
+        raise NoSuchElementException(f"No selector of {self.name} matched")
+
+    def _record(self, index: int | None, tried: List[Tuple[int, float]], elapsed: float) -> None:
+        """
+        Cache the selector that matched and update the statistics.
+
+        :param index: Index of the selector that matched, None if none did
+        :param tried: Indexes and durations of the selectors that were tried without matching
+        :param elapsed: Duration of the lookup in seconds
+        """
+        with self._lock:
+            if index is not None:
+                self.preferred = index
+                self.hits[index] += 1
+                self.lookup_seconds[index] += elapsed
+            for missed, seconds in tried:
+                self.misses[missed] += 1
+                self.miss_seconds[missed] += seconds
+        metrics.observe("locator_seconds", elapsed, control=self.name,
+                        selector=index if index is not None else "none")
+
+    def exists(self, context: object) -> bool:
+        """
+        Check whether the control is on the page, without waiting for it.
+
+        :param context: WebDriver or WebElement to search in
+        :return: True if a selector matches
+        """
+        try:
+            self.find(context)
+            return True
+        except NoSuchElementException:
+            return False
+
+    def css_selectors(self) -> List[str]:
+        """
+        :return: Values of the CSS selectors of the chain, for the scripts that look the control up in the page
+        """
+        return [selector.value for selector in self.selectors if selector.by == By.CSS_SELECTOR]
+
+    def _clickable(self, context: object | None, indexes: List[int],
+                   spent: Dict[int, float]) -> Callable[[object], Tuple[int, WebElement] | bool]:
+        """
+        Expected condition for wait_until: one of the given selectors finds the control present, visible and enabled.
+
+        :param context: WebElement to search in, the whole page if None
+        :param indexes: Indexes of the selectors to try at each poll, in order
+        :param spent: Time spent in each selector by index, updated at each poll
+        :return: Callable taking the driver and returning the index of the selector and the WebElement, or False
+        """
+
+        def condition(driver: object) -> Tuple[int, WebElement] | bool:
+            for index in indexes:
+                selector = self.selectors[index]
+                attempt_start = time.monotonic()
+                try:
+                    element = (context if context is not None else driver).find_element(by=selector.by,
+                                                                                        value=selector.value)
+                    if element.is_displayed() and element.is_enabled():
+                        return index, element
+                except (NoSuchElementException, StaleElementReferenceException):
+                    pass
+                finally:
+                    spent[index] = spent.get(index, 0.0) + time.monotonic() - attempt_start
+            return False
+
+        return condition
+
+    def wait_clickable(self, driver: object, description: str, context: object | None = None,
+                       timeout: float | None = None) -> WebElement:
+        """
+        Wait until the control is present, visible and enabled. Only the preferred selector is polled until the
+        timeout; the rest of the chain is then polled for FALLBACK_TIMEOUT. The statistics are recorded once, with
+        the outcome of the whole wait.
+
+        :param driver: WebDriver instance
+        :param description: What is waited for, used when reporting
+        :param context: WebElement to search in, the whole page if None
+        :param timeout: Maximum number of seconds to wait for the preferred selector, defaults to waits.DEFAULT_TIMEOUT
+        :return: WebElement of the control
+        :raises TimeoutException: If no selector found a clickable control in time
+        """
+        start = time.monotonic()
+        spent: Dict[int, float] = {}
+        preferred, *fallbacks = self._order()
+        try:
+            index, element = wait_until(driver, self._clickable(context, [preferred], spent), description,
+                                        timeout=timeout)
+        except TimeoutException:
+            if not fallbacks:
+                self._record(None, list(spent.items()), time.monotonic() - start)
+                raise
+            try:
+                index, element = wait_until(driver, self._clickable(context, fallbacks, spent),
+                                            f"{description} (fallback selectors)", timeout=FALLBACK_TIMEOUT)
+            except TimeoutException:
+                self._record(None, list(spent.items()), time.monotonic() - start)
+                raise
+        self._record(index, [(tried, seconds) for tried, seconds in spent.items() if tried != index],
+                     time.monotonic() - start)
+        return element
+
+    def stats(self) -> List[Dict[str, object]]:
+        """
+        Statistics of each selector.
+
+        :return: List of selector, hits, misses, hit rate, mean lookup time and mean time of a miss, in the order of
+            the chain
+        """
+        with self._lock:
+            return [
+                {
+                    "selector": f"{selector.by}={selector.value}",
+                    "hits": self.hits[i],
+                    "misses": self.misses[i],
+                    "hit_rate": round(self.hits[i] / (self.hits[i] + self.misses[i]), 3)
+                    if self.hits[i] + self.misses[i] else None,
+                    "mean_lookup_ms": round(1000 * self.lookup_seconds[i] / self.hits[i], 2) if self.hits[i] else None,
+                    "mean_miss_ms": round(1000 * self.miss_seconds[i] / self.misses[i], 2) if self.misses[i] else None,
+                }
+                for i, selector in enumerate(self.selectors)
+            ]
+
+
+class LocatorRegistry:
+    """
+    Locator chains of every control, by name.
+    """
+
+    def __init__(self, chains: Dict[str, List[Selector]]) -> None:
+        """
+        :param chains: Ordered selectors by control name
+        """
+        self.chains: Dict[str, LocatorChain] = {name: LocatorChain(name, selectors)
+                                                for name, selectors in chains.items()}
+
+    def __getitem__(self, name: str) -> LocatorChain:
+        return self.chains[name]
+
+    def stats(self) -> Dict[str, List[Dict[str, object]]]:
+        """
+        Statistics of every control.
+
+        :return: Dictionary of selector statistics by control name
+        """
+        return {name: chain.stats() for name, chain in self.chains.items()}
+
+
+# Selectors are scoped to the smallest known container and avoid scanning the text of every node of the document;
+# the last selector of each chain is the broad one the bot originally used
+locators = LocatorRegistry({
+    # "Share" button of a newsletter article
+    "share_trigger": [
+        Selector(By.ID, "publishing-entity-share-dropdown-trigger"),
+        Selector(By.CSS_SELECTOR, "button[aria-label^='Share']"),
+    ],
+    # "Repost to Feed" item of the share dropdown, matched by text only inside the dropdown
+    "repost_item": [
+        Selector(By.XPATH, "//*[@role='menu']//*[normalize-space(text())='Repost to Feed']"),
+        Selector(By.XPATH, "//*[contains(@class, 'artdeco-dropdown__content')]"
+                           "//*[normalize-space(text())='Repost to Feed']"),
+        Selector(By.XPATH, "//*[text()='Repost to Feed']"),
+    ],
+    # "Post" button of the share dialog
+    "post_button": [
+        Selector(By.CSS_SELECTOR, "button.share-actions__primary-action"),
+        Selector(By.XPATH, "//*[@role='dialog']//button[normalize-space()='Post']"),
+        Selector(By.XPATH, "//*[text()='Post']//ancestor::button"),
+    ],
+    # Newsletter card of the "See all" modal
+    "newsletter_card": [
+        Selector(By.CSS_SELECTOR, "[data-view-name='cohort-card']"),
+    ],
+    # "Subscribe" button, searched in a newsletter card; the fallback matches the accessible label, which also reads
+    # "Subscribed to" or "Unsubscribe" once subscribed, instead of the layout class
+    "subscribe_button": [
+        Selector(By.CSS_SELECTOR, "div[class='p3'] button"),
+        Selector(By.CSS_SELECTOR, "button[aria-label*='ubscribe']"),
+    ],
+    # Control showing that a section of the grow page lists newsletters, searched in a section
+    "newsletter_marker": [
+        Selector(By.CSS_SELECTOR, "[aria-label^='Subscribe to']"),
+        Selector(By.XPATH, ".//*[contains(@aria-label, 'Subscribe to')]"),
+    ],
+    # "See all" button of the newsletters section, searched in the section
+    "see_all_button": [
+        Selector(By.CSS_SELECTOR, "button[aria-label^='See all']"),
+        Selector(By.XPATH, ".//button[normalize-space()='See all']"),
+        Selector(By.TAG_NAME, "button"),
+    ],
+    # Heading of the page shown for a deleted or unavailable newsletter
+    "unavailable_marker": [
+        Selector(By.XPATH, "//h1[contains(., 'Page not found')]"),
+        Selector(By.XPATH, "//*[text()[contains(., 'no longer available')]]"),
+    ],
+    # Notice of the share dropdown or dialog of a newsletter article that was already reposted; only a text starting
+    # with the notice counts, so that a post quoting it does not stop the newsletter from being shared
+    "already_reposted_marker": [
+        Selector(By.XPATH, "//*[@role='menu']//*[starts-with(normalize-space(text()), 'You reposted')]"),
+        Selector(By.XPATH, "//*[@role='dialog']//*[starts-with(normalize-space(text()), 'You reposted')]"),
+    ],
+})
@@ -1,80 +1,184 @@
 """
 Main script to scrape LinkedIn newsletters, subscribe to them, and share them with connections.
+
+Commands (``python main.py <command> --help`` for their options):
+
+- ``daemon``: run cycles until interrupted, at most one per cycle interval (the default)
+- ``once``: run a single cycle
+- ``scrape``: subscribe to new newsletters and queue them for sharing, without sharing
+- ``share``: share the newsletters queued in the ledger, without scraping
+- ``pipeline``: run the subscription sweep and the sharing loop concurrently, each with its own browser
+- ``export-ledger`` / ``import-ledger``: copy the ledger to or from an Excel file
+- ``list-pending-shares``: list the newsletters waiting to be shared
+
+Only the standard library and the light modules are imported up front: Selenium, requests and openpyxl are imported,
+and Chrome launched, by the commands that use them, so that the ledger commands start immediately.
 """
+import argparse
+import importlib
 import time
-from typing import List
+from types import ModuleType
+from typing import List, Sequence, Tuple
+
+_STARTED_AT = time.perf_counter()  # Before the imports of the project modules, reported by --profile-startup
+
+from config import DEFAULT_CONFIG_FILE, load_config  # noqa: E402
+from metrics import configure_from_env  # noqa: E402
+from share_queue import ShareQueue  # noqa: E402
+from utils import open_store, import_excel_into_store, export_store_to_excel  # noqa: E402
+
+
+class StartupProfile:
+    """
+    Timings of the imports and the browser launch of a command, reported with --profile-startup.
+    """
+
+    def __init__(self, enabled: bool) -> None:
+        """
+        :param enabled: Print the timings when reporting
+        """
+        self.enabled = enabled
+        self.timings: List[Tuple[str, float]] = [("import project modules", time.perf_counter() - _STARTED_AT)]
+
+    def import_module(self, name: str) -> ModuleType:
+        """
+        Import a module, timing the import.
+
+        :param name: Name of the module
+        :return: Module
+        """
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        self.timings.append((f"import {name}", time.perf_counter() - start))
+        return module
 
-from selenium import webdriver
-from selenium.common import NoSuchElementException, WebDriverException
-from selenium.webdriver.chrome.webdriver import WebDriver
+    def record(self, name: str, seconds: float) -> None:
+        """
+        Record the duration of a startup step.
 
-from cookies_manager import load_cookies, save_cookies
-from internet_manager import wait_for_internet
-from linkedin_scraper import subscribe_to_newsletters
-from newsletter_sharing import share_newsletters
-from utils import save_newsletters_to_excel, load_newsletters_from_excel
+        :param name: Name of the step
+        :param seconds: Duration in seconds
+        """
+        self.timings.append((name, seconds))
 
-# Start WebDriver
-chrome_driver: WebDriver = webdriver.Chrome()
+    def report(self) -> None:
+        """
+        Print the timings and the total time since main.py started importing the project modules, if enabled.
+        """
+        if not self.enabled:
+            return
+        for name, seconds in self.timings:
+            print(f"startup {name:<28} {seconds * 1000:>9.1f} ms")
+        print(f"startup {'total':<28} {(time.perf_counter() - _STARTED_AT) * 1000:>9.1f} ms")
 
-def login_with_cookies(driver: WebDriver) -> None:
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
     """
-    Log in to LinkedIn using cookies if available, otherwise prompt for manual login.
+    Parse the command line.
 
-    :param driver: WebDriver instance
+    :param argv: Arguments, defaults to sys.argv[1:]
+    :return: Parsed arguments
     """
-    driver.get(url="https://www.linkedin.com/")
-
-    try:
-        load_cookies(driver=driver)
-        if "login" in driver.current_url:  # Check if still on the login page
-            input("Please log in manually and complete 2FA, then press Enter...")
-            save_cookies(driver=driver)
-    except FileNotFoundError as ex:  # Handle a missing cookies file
-        print(f"Cookies file not found: {ex}")
-    except Exception as ex:
-        print(f"Login failed: {ex}")
-        driver.quit()
+    parser = argparse.ArgumentParser(description="Subscribe to LinkedIn newsletters and share them.")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_FILE, help="JSON configuration file")
+    parser.add_argument("--headless", action="store_true", help="Run Chrome without a window")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report the time taken by the imports and the browser launch")
+    parser.set_defaults(interval=None, only=None)
+    commands = parser.add_subparsers(dest="command", metavar="command")
+
+    daemon_parser = commands.add_parser("daemon", help="Run cycles until interrupted (default)")
+    daemon_parser.add_argument("--interval", type=float, help="Minimum number of seconds between two cycles")
+    daemon_parser.add_argument("--only", choices=["scrape", "share"], help="Only run one of the stages")
+    commands.add_parser("once", help="Run a single cycle")
+    commands.add_parser("scrape", help="Subscribe to new newsletters and queue them, without sharing")
+    commands.add_parser("share", help="Share the newsletters queued in the ledger, without scraping")
+    pipeline_parser = commands.add_parser("pipeline",
+                                          help="Subscribe and share concurrently, each with its own browser")
+    pipeline_parser.add_argument("--queue-size", type=int, default=50,
+                                 help="Maximum number of URLs waiting to be shared")
+    for name, help_text in (("export-ledger", "Export the ledger to an Excel file"),
+                            ("import-ledger", "Import an Excel file into the ledger")):
+        ledger_parser = commands.add_parser(name, help=help_text)
+        ledger_parser.add_argument("--excel", help="Path of the Excel file, defaults to the configured one")
+    commands.add_parser("list-pending-shares", help="List the newsletters waiting to be shared")
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args.command = "daemon"  # Running without a command runs the daemon with its default options
+    return args
+
+
+def list_pending_shares(ledger_file: str) -> None:
+    """
+    Print the share jobs that are pending or in progress.
+
+    :param ledger_file: Path of the ledger database holding the share queue
+    """
+    with ShareQueue(file_name=ledger_file, recover_interrupted=False) as share_queue:
+        jobs = share_queue.jobs()
+    now = time.time()
+    for job in jobs:
+        due = "due" if job.next_eligible_at <= now else f"in {job.next_eligible_at - now:.0f}s"
+        error = f"  last error: {job.last_error}" if job.last_error else ""
+        print(f"{job.state:<12} {due:<10} attempts: {job.attempts}  {job.url}{error}")
+    print(f"{len(jobs)} newsletters waiting to be shared")
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """
+    Entry point of the command line.
+
+    :param argv: Arguments, defaults to sys.argv[1:]
+    """
+    args = parse_args(argv)
+    profile = StartupProfile(enabled=args.profile_startup)
+    config = load_config(file_name=args.config)
+    if args.headless:
+        config = config._replace(headless=True)
+
+    if args.command in ("export-ledger", "import-ledger"):
+        profile.import_module("openpyxl")
+        profile.report()
+        with open_store(file_name=config.ledger_file) as store:
+            if args.command == "export-ledger":
+                export_store_to_excel(store=store, file_name=args.excel or config.excel_file)
+            else:
+                import_excel_into_store(store=store, file_name=args.excel or config.excel_file)
+        return
+    if args.command == "list-pending-shares":
+        profile.report()
+        list_pending_shares(ledger_file=config.ledger_file)
+        return
+
+    # Commands using the browser
+    configure_from_env()
+    profile.import_module("selenium.webdriver")
+    profile.import_module("requests")
+    runner = profile.import_module("runner")
+    if args.command == "daemon" and args.interval:
+        config = config._replace(cycle_interval=args.interval)
+    runner.apply_config(config)
+
+    if args.command == "pipeline":
+        pipeline = profile.import_module("pipeline")
+        profile.report()
+        pipeline.Pipeline(config, queue_size=args.queue_size).run()
+        return
+
+    driver_manager = runner.create_driver_manager(config)
+    if args.profile_startup:
+        driver_manager.get_driver()
+        profile.record("driver launch", driver_manager.startup_seconds or 0.0)
+    profile.report()
+
+    if args.command == "daemon":
+        runner.run(config, scrape=args.only != "share", share=args.only != "scrape", daemon=True,
+                   driver_manager=driver_manager)
+    else:
+        runner.run(config, scrape=args.command in ("once", "scrape"), share=args.command in ("once", "share"),
+                   driver_manager=driver_manager)
+
 
 if __name__ == "__main__":
-    while True:
-        try:
-            wait_for_internet()
-            login_with_cookies(driver=chrome_driver)
-
-            # Load existing newsletter URLs
-            existing_urls = load_newsletters_from_excel()
-
-            time.sleep(5)
-
-            # Subscribe and scrape newsletter URLs
-            newsletter_urls: List[str] = subscribe_to_newsletters(driver=chrome_driver, existing_urls=existing_urls)
-
-            # Save URLs to Excel
-            save_newsletters_to_excel(newsletter_urls=newsletter_urls)
-
-            # Share newsletters and retry on errors
-            erroneous_urls = newsletter_urls  # Start with all scraped URLs
-            retry_count = 0
-            max_retries = 3  # Set a limit to avoid infinite retries
-
-            while erroneous_urls and retry_count < max_retries:
-                erroneous_urls = share_newsletters(driver=chrome_driver, newsletter_urls=erroneous_urls)
-                if erroneous_urls:
-                    print(
-                        f"\nFailed to share {len(erroneous_urls)} newsletters:\n{erroneous_urls}\nRetrying... (Attempt {retry_count + 1})")
-                retry_count += 1
-
-            if erroneous_urls:
-                print(
-                    f"\nFailed to share {len(erroneous_urls)} newsletters after {retry_count} attempts:\n{erroneous_urls}")
-
-        except NoSuchElementException as e:
-            print(f"Element not found: {e}")
-        except WebDriverException as e:
-            print(f"WebDriver error: {e}")
-        except Exception as e:
-            print(f"An error occurred: {e}")
-        finally:
-            # Sleep for a specified interval before the next iteration
-            time.sleep(60)
+    main()
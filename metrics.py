@@ -0,0 +1,296 @@
+"""
+This module provides lightweight instrumentation: timing spans, counters and histograms.
+
+Measurements are emitted as structured JSON log lines and can be exported in the Prometheus text format, to a file or
+from a local HTTP endpoint. When metrics are disabled every call returns immediately.
+"""
+import json
+import mmap
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Dict, Iterator, List, TextIO, Tuple
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+# Upper bounds of the histogram buckets, in seconds
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+# Upper bounds of the buckets of the memory histograms, in MiB
+MEMORY_BUCKETS_MB: Tuple[float, ...] = (100, 200, 300, 400, 500, 750, 1000, 1250, 1500, 2000, 3000, 4000)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+def _label_set(labels: Dict[str, object]) -> LabelSet:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: LabelSet, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (key + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+               for key, value in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+class Histogram:
+    """
+    Cumulative histogram of observed values.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        """
+        :param buckets: Upper bounds of the buckets
+        """
+        self.buckets = buckets
+        self.bucket_counts: List[int] = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        :param value: Observed value
+        """
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+
+
+def _children(pid: int) -> List[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children", encoding="ascii") as children_file:
+            return [int(child) for child in children_file.read().split()]
+    except OSError:
+        return []
+
+
+def _rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/statm", encoding="ascii") as statm_file:
+            return int(statm_file.read().split()[1]) * mmap.PAGESIZE
+    except OSError:
+        return 0
+
+
+def process_tree_rss(root_pid: int) -> int:
+    """
+    Resident set size of a process and all its descendants (Linux only, 0 elsewhere).
+
+    :param root_pid: PID of the root process
+    :return: RSS in bytes
+    """
+    total = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        total += _rss_bytes(pid)
+        pending.extend(_children(pid))
+    return total
+
+
+class Metrics:
+    """
+    Registry of counters and histograms with a structured JSON log.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.log_stream: TextIO = sys.stdout
+        self.counters: Dict[Tuple[str, LabelSet], float] = {}
+        self.histograms: Dict[Tuple[str, LabelSet], Histogram] = {}
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+
+    def configure(self, enabled: bool = True, log_file: str | None = None) -> None:
+        """
+        Enable or disable metrics.
+
+        :param enabled: Record and emit measurements
+        :param log_file: Append the JSON log lines to this file instead of the standard output, if given
+        """
+        self.enabled = enabled
+        if log_file:
+            self.log_stream = open(log_file, mode="a", encoding="utf-8", buffering=1)
+
+    def emit(self, event: str, **fields: object) -> None:
+        """
+        Write a structured JSON log line.
+
+        :param event: Name of the event
+        :param fields: Fields of the event
+        """
+        if not self.enabled:
+            return
+        record = {"ts": round(time.time(), 3), "event": event, **fields}
+        with self._lock:
+            self.log_stream.write(json.dumps(record, default=str) + "\n")
+
+    def increment(self, name: str, value: float = 1, **labels: object) -> None:
+        """
+        Increment a counter.
+
+        :param name: Name of the counter
+        :param value: Amount to add
+        :param labels: Labels of the counter
+        """
+        if not self.enabled:
+            return
+        key = (name, _label_set(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+                **labels: object) -> None:
+        """
+        Record a value in a histogram.
+
+        :param name: Name of the histogram
+        :param value: Observed value
+        :param buckets: Upper bounds of the buckets, used when the histogram is created
+        :param labels: Labels of the histogram
+        """
+        if not self.enabled:
+            return
+        key = (name, _label_set(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets=buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def _span(self, name: str, labels: Dict[str, object]) -> Iterator[Dict[str, object]]:
+        fields: Dict[str, object] = {}
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            yield fields
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe(f"{name}_seconds", elapsed, **labels)
+            self.emit("span", name=name, seconds=round(elapsed, 4), status=status, **labels, **fields)
+
+    def span(self, name: str, **labels: object):
+        """
+        Time the enclosed block, record it in the ``<name>_seconds`` histogram and emit a log line.
+        The context manager yields a dictionary of extra fields to add to the log line.
+
+        :param name: Name of the span
+        :param labels: Labels of the span
+        :return: Context manager
+        """
+        if not self.enabled:
+            return nullcontext({})
+        return self._span(name, labels)
+
+    def instrument_driver(self, driver: "WebDriver") -> None:
+        """
+        Time every WebDriver command sent by a driver.
+
+        :param driver: WebDriver instance
+        """
+        if not self.enabled:
+            return
+        execute = driver.execute
+
+        def timed_execute(driver_command: str, params: dict | None = None):
+            start = time.perf_counter()
+            try:
+                return execute(driver_command, params)
+            finally:
+                self.observe("webdriver_command_seconds", time.perf_counter() - start, command=driver_command)
+
+        driver.execute = timed_execute
+
+    def render_prometheus(self) -> str:
+        """
+        Render the counters and histograms in the Prometheus text format.
+
+        :return: Prometheus exposition text
+        """
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (counter_name, labels), value in self.counters.items():
+                    if counter_name == name:
+                        lines.append(f"{name}{_format_labels(labels)} {value}")
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (histogram_name, labels), histogram in self.histograms.items():
+                    if histogram_name != name:
+                        continue
+                    for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                        lines.append(f"{name}_bucket{_format_labels(labels, (('le', str(bound)),))} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, file_name: str) -> None:
+        """
+        Write the metrics in the Prometheus text format, e.g. for the node exporter textfile collector.
+
+        :param file_name: Path of the file
+        """
+        if not self.enabled:
+            return
+        temporary_file = f"{file_name}.tmp"
+        with open(temporary_file, mode="w", encoding="utf-8") as prometheus_file:
+            prometheus_file.write(self.render_prometheus())
+        os.replace(temporary_file, file_name)  # Scrapers never see a partially written file
+
+    def serve_prometheus(self, port: int, host: str = "127.0.0.1") -> None:
+        """
+        Serve the metrics in the Prometheus text format from a local HTTP endpoint in a background thread.
+
+        :param port: Port to listen on
+        :param host: Interface to listen on
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"Serving metrics at http://{host}:{port}/metrics")
+
+
+# Shared registry, disabled until configured
+metrics = Metrics()
+
+
+def configure_from_env() -> None:
+    """
+    Configure the shared registry from the environment:
+
+    - ``METRICS_ENABLED``: set to 1 to enable metrics
+    - ``METRICS_LOG_FILE``: file to append the JSON log lines to (standard output by default)
+    - ``METRICS_PROMETHEUS_PORT``: port of the local Prometheus endpoint, if any
+    - ``METRICS_PROMETHEUS_FILE``: file the Prometheus text is written to after each cycle, if any (read by the caller)
+    """
+    if os.environ.get("METRICS_ENABLED", "0") != "1":
+        return
+    metrics.configure(enabled=True, log_file=os.environ.get("METRICS_LOG_FILE"))
+    if os.environ.get("METRICS_PROMETHEUS_PORT"):
+        metrics.serve_prometheus(port=int(os.environ["METRICS_PROMETHEUS_PORT"]))
@@ -1,18 +1,78 @@
 """
-This module contains the function to share newsletters on LinkedIn by reposting them to the feed.
+This module contains the functions to share newsletters on LinkedIn by reposting them to the feed.
+
+Failed shares are classified and rescheduled through the durable queue with the backoff of their failure class;
+newsletters that are gone are given up at once, and those already reposted are recorded as shared.
 """
-import time
-from typing import List
+import threading
+from typing import Dict, List
 
 from selenium.common import NoSuchElementException, ElementClickInterceptedException, StaleElementReferenceException, \
     WebDriverException
 from selenium.webdriver.chrome.webdriver import WebDriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as ec
-from selenium.webdriver.support.wait import WebDriverWait
 
+from driver_manager import DriverManager
 from internet_manager import wait_for_internet
+from locators import locators
+from metrics import metrics
+from retries import FAILURE_ALREADY_DONE, FAILURE_CONNECTIVITY, Failure, SHARE_POLICIES, classify_failure
+from scheduler import scheduler
+from share_queue import ShareQueue
+from utils import NewsletterStore, STATUS_FAILED, STATUS_SHARED
+from waits import wait_until
+
+MEMORY_CHECK_INTERVAL: int = 10  # Share jobs between two health and memory checks of the browser
+
+
+def share_newsletter(driver: WebDriver, url: str, stop_event: threading.Event | None = None) -> Failure | None:
+    """
+    Share a newsletter on LinkedIn by reposting it to the feed.
+
+    :param driver: WebDriver instance
+    :param url: Newsletter URL to share
+    :param stop_event: Event that ends the waits for the connection and the pacing when set, if given
+    :return: Classified failure if sharing failed, None otherwise; the caller counts the failure with its outcome
+    """
+    if not wait_for_internet(stop_event):
+        return Failure(FAILURE_CONNECTIVITY, "Stopped while waiting for the connection")
+    # Stay within the repost rate limit to avoid being rate limited by LinkedIn
+    scheduler.acquire("repost", cancel=stop_event)
+    try:
+        # Navigate in the working tab instead of opening a new tab per newsletter
+        scheduler.acquire("navigate", cancel=stop_event)
+        driver.get(url=url)
+
+        # Wait for the page to load the share button
+        share_button: WebElement = locators["share_trigger"].wait_clickable(driver, description="share button")
+        scheduler.acquire("click", cancel=stop_event)
+        share_button.click()
+
+        # Wait for the dropdown with "Repost to Feed" to appear
+        repost_list_item: WebElement = locators["repost_item"].wait_clickable(driver,
+                                                                              description="'Repost to Feed' item")
+        scheduler.acquire("click", cancel=stop_event)
+        repost_list_item.click()
+
+        post_button: WebElement = locators["post_button"].wait_clickable(driver, description="'Post' button")
+        scheduler.acquire("click", cancel=stop_event)
+        post_button.click()
+
+        # The share dialog closes once the repost has been submitted
+        wait_until(driver, ec.staleness_of(post_button), description="repost confirmation")
+        print(f"Reposted newsletter: {url}")
+        metrics.increment("shares_total", outcome="shared")
+        return None
+    except (NoSuchElementException, ElementClickInterceptedException, StaleElementReferenceException,
+            WebDriverException) as e:
+        failure = classify_failure(e, driver)  # Also probes the connection before the next newsletter
+        print(f"Error occurred for {url} ({failure.failure_class}): {e}")
+        return failure
+    except Exception as e:
+        failure = classify_failure(e)
+        print(f"Failed to share newsletter {url} ({failure.failure_class}): {e}")
+        return failure
 
 
 def share_newsletters(driver: WebDriver, newsletter_urls: List[str]) -> List[str]:
@@ -24,41 +84,76 @@ def share_newsletters(driver: WebDriver, newsletter_urls: List[str]) -> List[str
     :return: List of URLs that failed to share
     """
     erroneous_urls: List[str] = []
-    for idx, url in enumerate(newsletter_urls):
-        # Pause for 10 minutes when visiting every 100 posts
-        if idx != 0 and idx % 100 == 0:
-            time.sleep(600)
-        driver.execute_script(script=f"window.open('{url}', '_blank');")
-        driver.switch_to.window(window_name=driver.window_handles[-1])
-        time.sleep(6)
-
-        # Wait for the dropdown with "Repost to Feed" to appear
-        wait = WebDriverWait(driver, timeout=10)
-
-        try:
-            share_button: WebElement = driver.find_element(by=By.ID, value="publishing-entity-share-dropdown-trigger")
-            share_button.click()
-            time.sleep(6)
-            repost_list_item: WebElement = wait.until(
-                ec.element_to_be_clickable((By.XPATH, "//*[text()='Repost to Feed']")))
-            repost_list_item.click()
-            time.sleep(6)
-
-            post_button = driver.find_element(by=By.XPATH, value="//*[text()='Post']//ancestor::button")
-            post_button.click()
-            time.sleep(6)
-            print(f"Reposted newsletter: {url}")
-        except (NoSuchElementException, ElementClickInterceptedException, StaleElementReferenceException,
-                WebDriverException) as e:
-            print(f"Error occurred for {url}: {e}")
+    for url in newsletter_urls:
+        failure = share_newsletter(driver, url)
+        if failure is not None:
+            metrics.increment("shares_total", outcome="failed", error=failure.failure_class)
             erroneous_urls.append(url)
-            wait_for_internet()  # Wait for internet connectivity
-        except Exception as e:
-            print(f"Failed to share newsletter {url}: {e}")
-            erroneous_urls.append(url)
-        finally:
-            driver.close()
-            driver.switch_to.window(window_name=driver.window_handles[0])
-
-        time.sleep(5)  # Pause to avoid rate limiting
     return erroneous_urls
+
+
+def share_claimed_job(driver: WebDriver, share_queue: ShareQueue, store: NewsletterStore, url: str,
+                      stop_event: threading.Event | None = None) -> str:
+    """
+    Share a newsletter whose job was claimed from the durable queue and record the outcome.
+
+    :param driver: WebDriver instance
+    :param share_queue: ShareQueue the job was claimed from
+    :param store: NewsletterStore where the sharing status of the newsletter is recorded
+    :param url: Newsletter URL
+    :param stop_event: Event that ends the waits for the connection and the pacing when set, if given
+    :return: Outcome of the job: "shared", "already_shared", "rescheduled" or "given_up"
+    """
+    failure = share_newsletter(driver, url, stop_event)
+    if failure is None:
+        share_queue.mark_done(url)
+        store.set_status(url=url, status=STATUS_SHARED)
+        store.record_attempt(url=url, action="share", outcome="shared")
+        return "shared"
+    if failure.failure_class == FAILURE_ALREADY_DONE:
+        # Reposting again would duplicate the repost, so the job is closed as if this attempt had shared it
+        print(f"Already reposted: {url}")
+        share_queue.mark_done(url)
+        store.set_status(url=url, status=STATUS_SHARED)
+        metrics.increment("shares_total", outcome="already_shared")
+        store.record_attempt(url=url, action="share", outcome="already_shared", failure_class=failure.failure_class,
+                             detail=failure.detail)
+        return "already_shared"
+
+    policy = SHARE_POLICIES[failure.failure_class]
+    store.set_status(url=url, status=STATUS_FAILED)
+    retry = share_queue.mark_failed(url, failure.detail, backoff_base=policy.backoff_base,
+                                    backoff_max=policy.backoff_max, max_attempts=policy.max_attempts)
+    outcome = "rescheduled" if retry else "given_up"
+    metrics.increment("shares_total", outcome=outcome, error=failure.failure_class)
+    store.record_attempt(url=url, action="share", outcome=outcome, failure_class=failure.failure_class,
+                         detail=failure.detail)
+    if not retry:
+        print(f"Giving up on sharing {url} ({failure.failure_class})")
+    return outcome
+
+
+def process_share_queue(driver_manager: DriverManager, share_queue: ShareQueue, store: NewsletterStore,
+                        memory_check_interval: int = MEMORY_CHECK_INTERVAL) -> Dict[str, int]:
+    """
+    Share every newsletter of the durable queue that is due, recording each outcome in the queue and the ledger.
+
+    The driver is fetched again every memory_check_interval jobs, which recycles the tab or restarts the browser if
+    Chrome went over its memory limit during a long queue.
+
+    :param driver_manager: DriverManager owning the WebDriver session
+    :param share_queue: ShareQueue of the newsletters to share
+    :param store: NewsletterStore where the sharing status of each newsletter is recorded
+    :param memory_check_interval: Number of jobs between two health and memory checks of the browser
+    :return: Number of jobs shared, found already shared, rescheduled and given up
+    """
+    outcomes: Dict[str, int] = {"shared": 0, "already_shared": 0, "rescheduled": 0, "given_up": 0}
+    driver: WebDriver = driver_manager.get_driver()
+    jobs = 0
+    while (url := share_queue.claim_next()) is not None:
+        if jobs and jobs % memory_check_interval == 0:
+            driver = driver_manager.get_driver()
+        outcomes[share_claimed_job(driver, share_queue, store, url)] += 1
+        jobs += 1
+    print(f"Share queue processed: {outcomes}, remaining: {share_queue.counts()}")
+    return outcomes
@@ -0,0 +1,179 @@
+"""
+Concurrent pipeline running the subscription sweep and the sharing loop at the same time.
+
+The scraper stage pushes every newsletter it subscribes to onto a bounded in-memory queue, consumed by the sharing
+stage with its own browser. A full queue blocks the scraper (backpressure). Every discovery is also written to the
+ledger and the durable share queue first, so nothing is lost if the pipeline stops before the URL is shared.
+
+Run with `python main.py pipeline`.
+"""
+import queue
+import threading
+import time
+from typing import NamedTuple
+
+from config import Config
+from cookies_manager import login_with_cookies
+from internet_manager import wait_for_internet
+from linkedin_scraper import subscribe_to_newsletters
+from metrics import metrics
+from newsletter_sharing import share_claimed_job
+from runner import create_driver_manager
+from scheduler import scheduler
+from share_queue import ShareQueue
+from utils import UrlIndex, open_store
+
+ERROR_RETRY_DELAY: float = 60  # Seconds a stage waits after failing to log in or reach LinkedIn
+
+
+class Discovery(NamedTuple):
+    """
+    Newsletter URL handed from the scraper stage to the sharing stage.
+    """
+    url: str
+    discovered_at: float  # time.monotonic() when the newsletter was subscribed to
+
+
+class Pipeline:
+    """
+    Producer/consumer pipeline of the scraper and sharing stages, each running in its own thread and browser.
+    """
+
+    def __init__(self, config: Config, queue_size: int = 50) -> None:
+        """
+        :param config: Config of the run; the sharing stage uses its sharer_chrome_profile
+        :param queue_size: Maximum number of discovered URLs waiting for the sharing stage
+        """
+        self.config = config
+        self.ledger_file = config.ledger_file
+        self.discoveries: "queue.Queue[Discovery]" = queue.Queue(maxsize=queue_size)
+        self.stop_event = threading.Event()
+        self.scraper_manager = create_driver_manager(config)
+        self.sharer_manager = create_driver_manager(config._replace(chrome_profile=config.sharer_chrome_profile))
+        self._threads = [
+            threading.Thread(target=self.run_scraper, name="scraper"),
+            threading.Thread(target=self.run_sharer, name="sharer"),
+        ]
+
+    def _offer(self, discovery: Discovery) -> None:
+        """
+        Hand a discovery to the sharing stage, blocking while the queue is full unless the pipeline is stopping.
+
+        :param discovery: Discovered newsletter
+        """
+        start = time.monotonic()
+        while not self.stop_event.is_set():
+            try:
+                self.discoveries.put(discovery, timeout=1)
+                break
+            except queue.Full:
+                continue
+        metrics.observe("pipeline_backpressure_seconds", time.monotonic() - start)
+
+    def run_scraper(self) -> None:
+        """
+        Scraper stage: sweep the newsletter modal at the pace of the "cycle" budget and push every new subscription to
+        the sharing stage.
+        """
+        with open_store(file_name=self.ledger_file) as store, \
+                ShareQueue(file_name=self.ledger_file, recover_interrupted=False) as share_queue:
+
+            def on_subscribed(url: str) -> None:
+                store.add(url=url)
+                share_queue.enqueue(urls=[url])
+                self._offer(Discovery(url=url, discovered_at=time.monotonic()))
+
+            try:
+                while not self.stop_event.is_set():
+                    scheduler.acquire("cycle", cancel=self.stop_event)
+                    if self.stop_event.is_set():
+                        break
+                    try:
+                        with metrics.span("stage", stage="subscribe") as span_fields:
+                            if not wait_for_internet(self.stop_event):
+                                break
+                            login_with_cookies(driver_manager=self.scraper_manager,
+                                               cookies_file=self.config.cookies_file)
+                            url_index = UrlIndex.from_store(store=store)
+                            subscribed = subscribe_to_newsletters(driver=self.scraper_manager.get_driver(),
+                                                                  url_index=url_index, max_new=self.config.max_new,
+                                                                  on_subscribed=on_subscribed,
+                                                                  stop_event=self.stop_event, store=store,
+                                                                  driver_manager=self.scraper_manager)
+                            span_fields["subscribed"] = len(subscribed)
+                    except Exception as e:
+                        print(f"Scraper stage error: {e}")
+            finally:
+                self.scraper_manager.quit()
+
+    def run_sharer(self) -> None:
+        """
+        Sharing stage: repost newsletters as soon as they are discovered, and the due retries of the durable queue
+        while no discovery is waiting.
+        """
+        with open_store(file_name=self.ledger_file) as store, ShareQueue(file_name=self.ledger_file) as share_queue:
+            try:
+                while not self.stop_event.is_set():
+                    try:
+                        discovery: Discovery | None = self.discoveries.get(timeout=1)
+                    except queue.Empty:
+                        discovery = None
+                        if not share_queue.has_due():
+                            continue
+
+                    if not wait_for_internet(self.stop_event):
+                        break  # A discovery taken from the queue stays in the durable share queue
+                    try:
+                        login_with_cookies(driver_manager=self.sharer_manager, cookies_file=self.config.cookies_file)
+                        driver = self.sharer_manager.get_driver()
+                    except Exception as e:
+                        print(f"Sharing stage error: {e}")
+                        self.stop_event.wait(ERROR_RETRY_DELAY)
+                        continue
+
+                    if discovery is not None:
+                        url = discovery.url
+                        if not share_queue.claim(url=url):
+                            continue  # Already shared or being retried from the durable queue
+                    else:
+                        url = share_queue.claim_next()
+                        if url is None:
+                            continue
+
+                    outcome = share_claimed_job(driver, share_queue, store, url, self.stop_event)
+                    if discovery is not None and outcome == "shared":
+                        latency = time.monotonic() - discovery.discovered_at
+                        metrics.observe("discovery_to_repost_seconds", latency)
+                        print(f"Reposted {url} {latency:.1f}s after discovering it")
+            finally:
+                self.sharer_manager.quit()
+
+    def start(self) -> None:
+        """
+        Start both stages.
+        """
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """
+        Ask both stages to stop after their current action and wait for them. Discoveries that were not shared yet
+        remain in the durable share queue.
+        """
+        self.stop_event.set()
+        for thread in self._threads:
+            thread.join()
+
+    def run(self) -> None:
+        """
+        Run the pipeline until interrupted with Ctrl+C.
+        """
+        self.start()
+        try:
+            while any(thread.is_alive() for thread in self._threads):
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print("Stopping the pipeline...")
+        finally:
+            self.stop()
+
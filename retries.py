@@ -0,0 +1,131 @@
+"""
+This module classifies the failures of the subscribe and share actions and decides whether and when to retry them.
+
+Each failure class has its own retry policy: a stale element is retried at once after fetching the element again, a
+lost connection after it is back, a timeout after a growing backoff, and permanent failures (newsletter gone, already
+reposted) are never retried.
+"""
+from typing import Dict, NamedTuple
+
+from selenium.common import ElementClickInterceptedException, NoSuchElementException, \
+    StaleElementReferenceException, TimeoutException
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+from internet_manager import connectivity
+from locators import locators
+
+FAILURE_CONNECTIVITY = "connectivity"
+FAILURE_TIMEOUT = "timeout"
+FAILURE_STALE_ELEMENT = "stale_element"
+FAILURE_CLICK_INTERCEPTED = "click_intercepted"
+FAILURE_MISSING_ELEMENT = "missing_element"
+FAILURE_GONE = "gone"  # Newsletter deleted or unavailable
+FAILURE_ALREADY_DONE = "already_done"  # Newsletter already reposted, as the share dropdown or dialog says
+FAILURE_UNKNOWN = "unknown"
+
+OFFLINE_GRACE: float = 1  # Seconds a failure waits for the connection to come back before it is classified as lost
+
+
+class Failure(NamedTuple):
+    """
+    Classified failure of an action.
+    """
+    failure_class: str
+    detail: str
+
+
+class RetryPolicy(NamedTuple):
+    """
+    Retry policy of a failure class.
+    """
+    max_attempts: int  # Number of failed attempts after which the action is given up, 0 to never retry
+    backoff_base: float  # Seconds before the first retry, doubled after each failed attempt
+    backoff_max: float  # Maximum number of seconds between two attempts
+
+    @property
+    def permanent(self) -> bool:
+        return self.max_attempts == 0
+
+    def delay(self, attempts: int) -> float:
+        """
+        :param attempts: Number of failed attempts so far
+        :return: Number of seconds to wait before the next attempt
+        """
+        return min(self.backoff_base * 2 ** max(attempts - 1, 0), self.backoff_max)
+
+
+_PERMANENT = RetryPolicy(max_attempts=0, backoff_base=0, backoff_max=0)
+
+# Retries within a subscription sweep, while the modal is open
+SUBSCRIBE_POLICIES: Dict[str, RetryPolicy] = {
+    FAILURE_STALE_ELEMENT: RetryPolicy(max_attempts=3, backoff_base=0, backoff_max=0),
+    FAILURE_CLICK_INTERCEPTED: RetryPolicy(max_attempts=3, backoff_base=1, backoff_max=5),
+    FAILURE_TIMEOUT: RetryPolicy(max_attempts=3, backoff_base=2, backoff_max=10),
+    FAILURE_CONNECTIVITY: RetryPolicy(max_attempts=5, backoff_base=5, backoff_max=60),
+    FAILURE_MISSING_ELEMENT: RetryPolicy(max_attempts=2, backoff_base=1, backoff_max=1),
+    FAILURE_UNKNOWN: RetryPolicy(max_attempts=2, backoff_base=2, backoff_max=10),
+    FAILURE_GONE: _PERMANENT,
+    FAILURE_ALREADY_DONE: RetryPolicy(max_attempts=1, backoff_base=0, backoff_max=0),
+}
+
+# Retries of share jobs across cycles, through the durable share queue
+SHARE_POLICIES: Dict[str, RetryPolicy] = {
+    FAILURE_STALE_ELEMENT: RetryPolicy(max_attempts=5, backoff_base=30, backoff_max=5 * 60),
+    FAILURE_CLICK_INTERCEPTED: RetryPolicy(max_attempts=5, backoff_base=60, backoff_max=30 * 60),
+    FAILURE_TIMEOUT: RetryPolicy(max_attempts=8, backoff_base=5 * 60, backoff_max=6 * 60 * 60),
+    FAILURE_CONNECTIVITY: RetryPolicy(max_attempts=20, backoff_base=60, backoff_max=30 * 60),
+    FAILURE_MISSING_ELEMENT: RetryPolicy(max_attempts=3, backoff_base=30 * 60, backoff_max=6 * 60 * 60),
+    FAILURE_UNKNOWN: RetryPolicy(max_attempts=8, backoff_base=5 * 60, backoff_max=6 * 60 * 60),
+    FAILURE_GONE: _PERMANENT,
+    # Never retried, a second repost would duplicate the first; the newsletter is recorded as shared instead
+    FAILURE_ALREADY_DONE: _PERMANENT,
+}
+
+
+def detect_page_failure(driver: WebDriver) -> str | None:
+    """
+    Check whether the current page shows a failure that retrying cannot fix.
+
+    :param driver: WebDriver instance
+    :return: FAILURE_GONE or FAILURE_ALREADY_DONE, or None if the page shows neither
+    """
+    try:
+        if "/404" in driver.current_url or locators["unavailable_marker"].exists(driver):
+            return FAILURE_GONE
+        if locators["already_reposted_marker"].exists(driver):
+            return FAILURE_ALREADY_DONE
+    except Exception:  # The page itself may be gone with the connection or the browser
+        return None
+    return None
+
+
+def classify_failure(error: BaseException, driver: WebDriver | None = None) -> Failure:
+    """
+    Classify the exception raised by an action.
+
+    The monitor is asked to probe the connection again in its own thread, and the classification waits at most
+    OFFLINE_GRACE seconds for the connection if the monitor already reports it as down, so that a connection lost
+    during the action is not mistaken for a timeout or a missing element. A loss the monitor has not noticed yet is
+    caught when the next action fails.
+
+    :param error: Exception raised by the action
+    :param driver: WebDriver instance, used to check whether the page shows a permanent failure, if given
+    :return: Failure
+    """
+    detail = f"{error.__class__.__name__}: {error}".strip()
+    if isinstance(error, StaleElementReferenceException):
+        return Failure(FAILURE_STALE_ELEMENT, detail)
+    if isinstance(error, ElementClickInterceptedException):
+        return Failure(FAILURE_CLICK_INTERCEPTED, detail)
+    connectivity.recheck()
+    if "net::ERR_" in str(error) or not connectivity.wait_until_online(timeout=OFFLINE_GRACE):
+        return Failure(FAILURE_CONNECTIVITY, detail)
+
+    page_failure = detect_page_failure(driver) if driver is not None else None
+    if page_failure is not None:
+        return Failure(page_failure, detail)
+    if isinstance(error, TimeoutException):
+        return Failure(FAILURE_TIMEOUT, detail)
+    if isinstance(error, NoSuchElementException):
+        return Failure(FAILURE_MISSING_ELEMENT, detail)
+    return Failure(FAILURE_UNKNOWN, detail)
@@ -0,0 +1,168 @@
+"""
+This module runs the cycles of the bot: log in, subscribe to new newsletters and share the queued ones.
+
+It imports Selenium and launches Chrome, so the command line only imports it for the commands that use the browser.
+"""
+import os
+from typing import List, Tuple
+
+from selenium.common import NoSuchElementException, WebDriverException
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+import waits
+from config import Config
+from cookies_manager import login_with_cookies
+from driver_manager import DriverManager
+from internet_manager import wait_for_internet
+from linkedin_scraper import subscribe_to_newsletters
+from locators import locators
+from metrics import metrics
+from newsletter_sharing import process_share_queue
+from scheduler import scheduler
+from share_queue import ShareQueue
+from utils import open_store, import_excel_into_store, NewsletterStore, UrlIndex, STATUS_FAILED
+
+
+def apply_config(config: Config) -> None:
+    """
+    Apply the timeouts and pacing of the configuration to the shared modules.
+
+    :param config: Config of the run
+    """
+    waits.DEFAULT_TIMEOUT = config.wait_timeout
+    scheduler.load(file_name=config.pacing_file)
+    if config.cycle_interval:
+        scheduler.configure({"cycle": {"rate_per_minute": 60 / config.cycle_interval, "burst": 1}})
+
+
+def open_ledger(config: Config) -> Tuple[NewsletterStore, ShareQueue]:
+    """
+    Open the ledger and the durable share queue, migrating the data of earlier versions.
+
+    :param config: Config of the run
+    :return: NewsletterStore and ShareQueue
+    """
+    store: NewsletterStore = open_store(file_name=config.ledger_file)
+    if store.count() == 0:
+        # One-time migration of the Excel ledger used by earlier versions
+        import_excel_into_store(store=store, file_name=config.excel_file)
+
+    # Newsletters that failed to share before the durable queue existed are queued again
+    share_queue = ShareQueue(file_name=config.ledger_file)
+    share_queue.enqueue(urls=store.iter_urls(status=STATUS_FAILED))
+    return store, share_queue
+
+
+def run_cycle(driver_manager: DriverManager, store: NewsletterStore, share_queue: ShareQueue, config: Config,
+              scrape: bool = True, share: bool = True) -> None:
+    """
+    Run one cycle: log in, subscribe to new newsletters and share the queued ones.
+
+    :param driver_manager: DriverManager owning the WebDriver session
+    :param store: NewsletterStore of the ledger
+    :param share_queue: ShareQueue of the newsletters to share
+    :param config: Config of the run
+    :param scrape: Subscribe to new newsletters and queue them for sharing
+    :param share: Share the queued newsletters that are due
+    """
+    with metrics.span("cycle"):
+        with metrics.span("stage", stage="connectivity"):
+            wait_for_internet()
+        with metrics.span("stage", stage="login"):
+            login_with_cookies(driver_manager=driver_manager, cookies_file=config.cookies_file)
+            driver: WebDriver = driver_manager.get_driver()
+
+        if scrape:
+            # Load existing newsletter URLs
+            with metrics.span("stage", stage="ledger_load"):
+                url_index = UrlIndex.from_store(store=store)
+
+            def on_subscribed(url: str) -> None:
+                # Saved as soon as it is subscribed to, so a sweep that crashes partway loses nothing
+                store.add(url=url)
+                share_queue.enqueue(urls=[url])
+
+            # Subscribe and scrape newsletter URLs
+            with metrics.span("stage", stage="subscribe") as span_fields:
+                newsletter_urls: List[str] = subscribe_to_newsletters(driver=driver, url_index=url_index,
+                                                                      max_new=config.max_new,
+                                                                      on_subscribed=on_subscribed, store=store,
+                                                                      driver_manager=driver_manager)
+                span_fields["subscribed"] = len(newsletter_urls)
+
+            # Make sure every subscription is in the ledger and queued for sharing; already saved ones are ignored
+            with metrics.span("stage", stage="ledger_save"):
+                store.add_many(urls=newsletter_urls)
+                share_queue.enqueue(urls=newsletter_urls)
+
+        if share:
+            # Share every queued newsletter that is due, failed ones are retried with a backoff in later cycles
+            with metrics.span("stage", stage="share") as span_fields:
+                share_outcomes = process_share_queue(driver_manager=driver_manager, share_queue=share_queue,
+                                                     store=store)
+                span_fields.update(share_outcomes)
+
+
+def report_cycle(prometheus_file: str | None) -> None:
+    """
+    Report the pacing and locator statistics after a cycle.
+
+    :param prometheus_file: File the Prometheus text is written to, if any
+    """
+    pacing_stats = scheduler.stats()
+    metrics.emit("scheduler", actions=pacing_stats)
+    metrics.emit("locators", controls=locators.stats())
+    print("Pacing utilization: " + ", ".join(f"{action} {stats['utilization']:.0%}"
+                                             for action, stats in pacing_stats.items()))
+    if prometheus_file:
+        metrics.write_prometheus(file_name=prometheus_file)
+
+
+def create_driver_manager(config: Config) -> DriverManager:
+    """
+    Create the DriverManager of the configured Chrome profile, without launching Chrome yet.
+
+    :param config: Config of the run
+    :return: DriverManager
+    """
+    return DriverManager(user_data_dir=config.chrome_profile, headless=config.headless,
+                         trim_resources=config.trim_resources, memory_limit_mb=config.memory_limit_mb)
+
+
+def run(config: Config, scrape: bool = True, share: bool = True, daemon: bool = False,
+        driver_manager: DriverManager | None = None) -> None:
+    """
+    Run a single cycle, or cycles until interrupted in daemon mode.
+
+    :param config: Config of the run
+    :param scrape: Subscribe to new newsletters and queue them for sharing
+    :param share: Share the queued newsletters that are due
+    :param daemon: Keep running cycles, at most one per cycle interval
+    :param driver_manager: DriverManager to use, e.g. with Chrome already launched, a new one if None
+    """
+    prometheus_file = os.environ.get("METRICS_PROMETHEUS_FILE")
+    driver_manager = driver_manager or create_driver_manager(config)
+    store, share_queue = open_ledger(config)
+    try:
+        while True:
+            if daemon:
+                # Wait for the budget of the next cycle, only as long as the previous one was shorter than the interval
+                scheduler.acquire("cycle")
+            try:
+                run_cycle(driver_manager, store, share_queue, config, scrape=scrape, share=share)
+            except NoSuchElementException as e:
+                print(f"Element not found: {e}")
+            except WebDriverException as e:
+                print(f"WebDriver error: {e}")
+            except Exception as e:
+                print(f"An error occurred: {e}")
+            finally:
+                report_cycle(prometheus_file)
+            if not daemon:
+                break
+    except KeyboardInterrupt:
+        print("Stopping...")
+    finally:
+        driver_manager.quit()
+        share_queue.close()
+        store.close()
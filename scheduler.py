@@ -0,0 +1,158 @@
+"""
+This module paces actions on LinkedIn with one token bucket per action type.
+
+Each action type (navigate, click, scroll, subscribe, repost, cycle) has a sustained rate and a burst size, loaded
+from a JSON file. Callers acquire a token before acting: they proceed immediately while the budget allows and only
+wait for as long as it takes to refill a token otherwise, instead of sleeping for a fixed worst-case time.
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict
+
+from metrics import metrics
+
+DEFAULT_CONFIG_FILE = "pacing.json"
+
+# Sustained rate (actions per minute) and burst size of each action type
+DEFAULT_LIMITS: Dict[str, Dict[str, float]] = {
+    "navigate": {"rate_per_minute": 20, "burst": 3},
+    "click": {"rate_per_minute": 30, "burst": 5},
+    "scroll": {"rate_per_minute": 60, "burst": 5},
+    "subscribe": {"rate_per_minute": 20, "burst": 5},
+    "repost": {"rate_per_minute": 100 / 60, "burst": 10},
+    "cycle": {"rate_per_minute": 1, "burst": 1},
+}
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at a constant rate up to its capacity. Thread-safe.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """
+        :param rate: Number of tokens added per second
+        :param capacity: Maximum number of tokens, i.e. the burst size
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.created_at = self.updated_at = time.monotonic()
+        self.acquired = 0
+        self.waited_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Take tokens from the bucket, going into debt if there are not enough of them.
+
+        :param tokens: Number of tokens to take
+        :return: Number of seconds the caller has to wait before acting
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= tokens
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            self.acquired += tokens
+            self.waited_seconds += delay
+            return delay
+
+    def utilization(self) -> float:
+        """
+        Share of the budget granted since the bucket was created that has been used.
+
+        :return: Used tokens divided by the tokens made available (initial burst plus refills)
+        """
+        budget = self.capacity + (time.monotonic() - self.created_at) * self.rate
+        return self.acquired / budget if budget else 0.0
+
+
+class Scheduler:
+    """
+    Rate limits of every action type.
+    """
+
+    def __init__(self, limits: Dict[str, Dict[str, float]] | None = None) -> None:
+        """
+        :param limits: Dictionary of {"rate_per_minute", "burst"} by action type, defaults to DEFAULT_LIMITS
+        """
+        self.enabled = True
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.configure(limits or DEFAULT_LIMITS)
+
+    def configure(self, limits: Dict[str, Dict[str, float]]) -> None:
+        """
+        Replace the limits of the given action types.
+
+        :param limits: Dictionary of {"rate_per_minute", "burst"} by action type
+        :raises ValueError: If a rate is not above 0 or a burst is below 1
+        """
+        for action, limit in limits.items():
+            rate_per_minute, burst = limit["rate_per_minute"], limit.get("burst", 1)
+            if rate_per_minute <= 0:
+                raise ValueError(f"Rate of {action} must be above 0 actions per minute, got {rate_per_minute}")
+            if burst < 1:
+                raise ValueError(f"Burst of {action} must be at least 1, got {burst}")
+        for action, limit in limits.items():
+            self.buckets[action] = TokenBucket(rate=limit["rate_per_minute"] / 60, capacity=limit.get("burst", 1))
+
+    def load(self, file_name: str = DEFAULT_CONFIG_FILE) -> None:
+        """
+        Load the limits from a JSON file, keeping the defaults of the action types it does not mention.
+
+        :param file_name: Path of the JSON file
+        """
+        if not os.path.exists(file_name):
+            return
+        with open(file_name, encoding="utf-8") as config_file:
+            self.configure(json.load(config_file))
+        print(f"Loaded pacing limits from {file_name}")
+
+    def disable(self) -> None:
+        """
+        Let every action proceed immediately, e.g. against the local stand-in.
+        """
+        self.enabled = False
+
+    def acquire(self, action: str, cancel: threading.Event | None = None) -> float:
+        """
+        Wait until the budget of an action type allows one more action.
+
+        :param action: Action type; action types without a limit proceed immediately
+        :param cancel: Event that interrupts the wait when set, if given
+        :return: Number of seconds waited
+        """
+        bucket = self.buckets.get(action)
+        if not self.enabled or bucket is None:
+            return 0.0
+        delay = bucket.reserve()
+        if delay:
+            if cancel is not None:
+                cancel.wait(delay)
+            else:
+                time.sleep(delay)
+        metrics.observe("pacing_seconds", delay, action=action)
+        return delay
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Usage of each action type's budget.
+
+        :return: Dictionary of acquired count, total wait and utilization by action type
+        """
+        return {
+            action: {
+                "acquired": bucket.acquired,
+                "waited_seconds": round(bucket.waited_seconds, 2),
+                "utilization": round(bucket.utilization(), 3),
+            }
+            for action, bucket in self.buckets.items()
+        }
+
+
+# Shared scheduler: the limits apply to the whole process, whichever stage or thread acts
+scheduler = Scheduler()
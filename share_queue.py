@@ -0,0 +1,211 @@
+"""
+This module contains a durable queue of share jobs kept in the SQLite ledger database.
+
+Each job records its state, number of attempts and the time it next becomes eligible, so that sharing resumes where
+it stopped after a crash and failed URLs are retried with an exponential backoff across cycles.
+"""
+import sqlite3
+import time
+from typing import Dict, Iterable, List, NamedTuple
+
+from utils import DEFAULT_LEDGER_FILE, normalize_url
+
+STATE_PENDING = "pending"
+STATE_IN_PROGRESS = "in_progress"
+STATE_DONE = "done"
+STATE_DEAD = "dead"  # Gave up after too many attempts
+
+BACKOFF_BASE: float = 300  # Seconds before the first retry, doubled after each failed attempt
+BACKOFF_MAX: float = 6 * 60 * 60
+MAX_ATTEMPTS: int = 8
+
+
+class ShareJob(NamedTuple):
+    """
+    Snapshot of a share job.
+    """
+    url: str
+    state: str
+    attempts: int
+    next_eligible_at: float  # time.time() after which the job can be claimed
+    last_error: str | None
+
+
+class ShareQueue:
+    """
+    Persistent queue of newsletter URLs to share.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS share_jobs (
+            normalized_url TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            state TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_eligible_at REAL NOT NULL,
+            last_error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_share_jobs_due ON share_jobs (state, next_eligible_at);
+    """
+
+    def __init__(self, file_name: str = DEFAULT_LEDGER_FILE, backoff_base: float = BACKOFF_BASE,
+                 backoff_max: float = BACKOFF_MAX, max_attempts: int = MAX_ATTEMPTS,
+                 recover_interrupted: bool = True) -> None:
+        """
+        Open the queue and put back the jobs that were in progress when the previous run stopped.
+
+        :param file_name: Path of the SQLite database file
+        :param backoff_base: Seconds before the first retry, doubled after each failed attempt
+        :param backoff_max: Maximum number of seconds between two attempts
+        :param max_attempts: Number of failed attempts after which a job is given up
+        :param recover_interrupted: Put jobs left in progress back to pending, disable for a connection opened
+                                    while another one of the same run may be sharing
+        """
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_attempts = max_attempts
+        self.connection = sqlite3.connect(file_name)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self._SCHEMA)
+        if not recover_interrupted:
+            return
+        with self.connection:
+            recovered = self.connection.execute(
+                "UPDATE share_jobs SET state = ? WHERE state = ?", (STATE_PENDING, STATE_IN_PROGRESS)).rowcount
+        if recovered:
+            print(f"Resuming {recovered} share jobs interrupted in the previous run")
+
+    def enqueue(self, urls: Iterable[str]) -> int:
+        """
+        Add URLs to the queue, ignoring the ones that are already queued.
+
+        :param urls: Newsletter URLs to share
+        :return: Number of URLs added
+        """
+        now = time.time()
+        added = 0
+        with self.connection:
+            for url in urls:
+                added += self.connection.execute(
+                    "INSERT OR IGNORE INTO share_jobs (normalized_url, url, state, next_eligible_at, created_at, "
+                    "updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (normalize_url(url), url, STATE_PENDING, now, now, now)).rowcount
+        return added
+
+    def claim_next(self) -> str | None:
+        """
+        Take the next job that is due and mark it in progress.
+
+        :return: URL to share, or None if no job is due
+        """
+        now = time.time()
+        with self.connection:
+            row = self.connection.execute(
+                "SELECT normalized_url, url FROM share_jobs WHERE state = ? AND next_eligible_at <= ? "
+                "ORDER BY next_eligible_at LIMIT 1", (STATE_PENDING, now)).fetchone()
+            if row is None:
+                return None
+            self.connection.execute("UPDATE share_jobs SET state = ?, updated_at = ? WHERE normalized_url = ?",
+                                    (STATE_IN_PROGRESS, now, row[0]))
+        return row[1]
+
+    def has_due(self) -> bool:
+        """
+        Check whether a job is due, without claiming it.
+
+        :return: True if at least one pending job is eligible now
+        """
+        return self.connection.execute(
+            "SELECT 1 FROM share_jobs WHERE state = ? AND next_eligible_at <= ? LIMIT 1",
+            (STATE_PENDING, time.time())).fetchone() is not None
+
+    def claim(self, url: str) -> bool:
+        """
+        Mark a specific job in progress if it is pending.
+
+        :param url: Newsletter URL
+        :return: True if the job was claimed, False if it is not pending (e.g. already shared or claimed)
+        """
+        with self.connection:
+            return self.connection.execute(
+                "UPDATE share_jobs SET state = ?, updated_at = ? WHERE normalized_url = ? AND state = ?",
+                (STATE_IN_PROGRESS, time.time(), normalize_url(url), STATE_PENDING)).rowcount == 1
+
+    def mark_done(self, url: str) -> None:
+        """
+        Mark a job as successfully shared.
+
+        :param url: Newsletter URL
+        """
+        with self.connection:
+            self.connection.execute(
+                "UPDATE share_jobs SET state = ?, attempts = attempts + 1, last_error = NULL, updated_at = ? "
+                "WHERE normalized_url = ?", (STATE_DONE, time.time(), normalize_url(url)))
+
+    def mark_failed(self, url: str, error: str, backoff_base: float | None = None, backoff_max: float | None = None,
+                    max_attempts: int | None = None) -> bool:
+        """
+        Record a failed attempt and schedule the next one with an exponential backoff.
+
+        The backoff and the attempt limit default to those of the queue; the caller can override them with the retry
+        policy of the failure, e.g. max_attempts=0 to give up on a failure that retrying cannot fix.
+
+        :param url: Newsletter URL
+        :param error: Description of the failure
+        :param backoff_base: Seconds before the first retry, doubled after each failed attempt
+        :param backoff_max: Maximum number of seconds between two attempts
+        :param max_attempts: Number of failed attempts after which the job is given up
+        :return: True if the job will be retried, False if it was given up
+        """
+        backoff_base = self.backoff_base if backoff_base is None else backoff_base
+        backoff_max = self.backoff_max if backoff_max is None else backoff_max
+        max_attempts = self.max_attempts if max_attempts is None else max_attempts
+        normalized_url = normalize_url(url)
+        now = time.time()
+        with self.connection:
+            row = self.connection.execute("SELECT attempts FROM share_jobs WHERE normalized_url = ?",
+                                          (normalized_url,)).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            retry = attempts < max_attempts
+            delay = min(backoff_base * 2 ** (attempts - 1), backoff_max)
+            self.connection.execute(
+                "UPDATE share_jobs SET state = ?, attempts = ?, next_eligible_at = ?, last_error = ?, updated_at = ? "
+                "WHERE normalized_url = ?",
+                (STATE_PENDING if retry else STATE_DEAD, attempts, now + delay, error, now, normalized_url))
+        return retry
+
+    def jobs(self, states: Iterable[str] = (STATE_PENDING, STATE_IN_PROGRESS)) -> List[ShareJob]:
+        """
+        List the jobs in the given states, the earliest eligible first.
+
+        :param states: States of the jobs to list
+        :return: List of ShareJob records
+        """
+        states = list(states)
+        rows = self.connection.execute(
+            f"SELECT url, state, attempts, next_eligible_at, last_error FROM share_jobs "
+            f"WHERE state IN ({', '.join('?' * len(states))}) ORDER BY next_eligible_at", states).fetchall()
+        return [ShareJob(*row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Count the jobs in each state.
+
+        :return: Dictionary of job counts by state
+        """
+        return dict(self.connection.execute("SELECT state, COUNT(*) FROM share_jobs GROUP BY state").fetchall())
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        self.connection.close()
+
+    def __enter__(self) -> "ShareQueue":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,28 @@
+"""
+Shared fixtures of the test suite. The modules of the bot live at the root of the repository.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import SQLiteNewsletterStore  # noqa: E402
+
+
+@pytest.fixture
+def ledger_file(tmp_path) -> str:
+    """
+    :return: Path of an empty ledger database in a temporary directory
+    """
+    return str(tmp_path / "newsletters.db")
+
+
+@pytest.fixture
+def store(ledger_file):
+    """
+    :return: SQLiteNewsletterStore of an empty ledger, closed after the test
+    """
+    with SQLiteNewsletterStore(file_name=ledger_file) as newsletter_store:
+        yield newsletter_store
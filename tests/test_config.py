@@ -0,0 +1,25 @@
+import json
+
+import pytest
+
+from config import Config, load_config
+
+
+def test_load_config_defaults_without_file(tmp_path):
+    assert load_config(file_name=str(tmp_path / "missing.json")) == Config()
+
+
+def test_load_config_overrides_given_settings(tmp_path):
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({"headless": True, "wait_timeout": 15}), encoding="utf-8")
+    config = load_config(file_name=str(config_file))
+    assert config.headless
+    assert config.wait_timeout == 15
+    assert config.ledger_file == Config().ledger_file
+
+
+def test_load_config_rejects_unknown_settings(tmp_path):
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({"headless": True, "wait_timout": 15}), encoding="utf-8")
+    with pytest.raises(ValueError, match="wait_timout"):
+        load_config(file_name=str(config_file))
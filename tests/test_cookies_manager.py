@@ -0,0 +1,73 @@
+import json
+import os
+import pickle
+import time
+
+from cookies_manager import _to_cdp_cookie, cookies_are_fresh, migrate_legacy_cookies, read_cookies, write_cookies
+from driver_manager import SESSION_COOKIE
+
+
+def session_cookie(expiry=None):
+    cookie = {"name": SESSION_COOKIE, "value": "token", "domain": ".www.linkedin.com", "path": "/"}
+    if expiry is not None:
+        cookie["expiry"] = expiry
+    return cookie
+
+
+def test_cookies_are_fresh_checks_the_session_cookie_expiry():
+    now = time.time()
+    assert cookies_are_fresh([session_cookie(expiry=now + 7200)], margin=3600)
+    assert not cookies_are_fresh([session_cookie(expiry=now + 1800)], margin=3600)
+    assert not cookies_are_fresh([session_cookie(expiry=now - 10)])
+    assert cookies_are_fresh([session_cookie()])  # Session cookie without expiry
+    assert not cookies_are_fresh([{"name": "lang", "value": "en"}])
+    assert not cookies_are_fresh([])
+
+
+def test_to_cdp_cookie_converts_the_webdriver_format():
+    cookie = {"name": "lang", "value": "en", "domain": ".linkedin.com", "path": "/", "secure": True,
+              "httpOnly": False, "expiry": 1900000000, "sameSite": "None"}
+    assert _to_cdp_cookie(cookie) == {"name": "lang", "value": "en", "domain": ".linkedin.com", "path": "/",
+                                      "secure": True, "httpOnly": False, "expires": 1900000000, "sameSite": "None"}
+
+
+def test_to_cdp_cookie_fills_defaults_and_drops_unknown_same_site():
+    cdp_cookie = _to_cdp_cookie({"name": "lang", "value": "en", "sameSite": "unspecified"})
+    assert cdp_cookie == {"name": "lang", "value": "en", "domain": ".linkedin.com", "path": "/", "secure": False,
+                          "httpOnly": False}
+
+
+def test_write_and_read_cookies(tmp_path):
+    file_name = str(tmp_path / "cookies.json")
+    cookies = [session_cookie(expiry=1900000000)]
+    write_cookies(cookies=cookies, file_name=file_name, saved_at=123)
+
+    with open(file_name, encoding="utf-8") as cookies_file:
+        record = json.load(cookies_file)
+    assert record["saved_at"] == 123
+    assert record["session_expiry"] == 1900000000
+    assert read_cookies(file_name=file_name) == cookies
+    assert not os.path.exists(f"{file_name}.tmp")
+
+
+def test_read_cookies_without_store(tmp_path):
+    assert read_cookies(file_name=str(tmp_path / "cookies.json")) == []
+
+
+def test_migrate_legacy_pickle(tmp_path):
+    file_name = str(tmp_path / "cookies.json")
+    legacy_file_name = str(tmp_path / "cookies.pkl")
+    cookies = [session_cookie(expiry=1900000000)]
+    with open(legacy_file_name, "wb") as legacy_file:
+        pickle.dump(cookies, legacy_file)
+
+    migrate_legacy_cookies(file_name=file_name, legacy_file_name=legacy_file_name)
+    assert read_cookies(file_name=file_name) == cookies
+    with open(file_name, encoding="utf-8") as cookies_file:
+        assert json.load(cookies_file)["saved_at"] == os.path.getmtime(legacy_file_name)
+
+    # An existing store is never overwritten by the pickle file
+    with open(legacy_file_name, "wb") as legacy_file:
+        pickle.dump([], legacy_file)
+    migrate_legacy_cookies(file_name=file_name, legacy_file_name=legacy_file_name)
+    assert read_cookies(file_name=file_name) == cookies
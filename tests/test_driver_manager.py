@@ -0,0 +1,52 @@
+import os
+import sys
+
+import pytest
+
+from driver_manager import DriverManager
+from metrics import process_tree_rss
+
+
+class RecordingManager(DriverManager):
+    """
+    DriverManager with a stand-in browser whose memory readings are scripted.
+    """
+
+    def __init__(self, readings, memory_limit_mb=100):
+        super().__init__(memory_limit_mb=memory_limit_mb)
+        self._driver = object()
+        self.readings = list(readings)
+        self.actions = []
+
+    def memory_mb(self):
+        return self.readings.pop(0)
+
+    def recycle_tab(self):
+        self.actions.append("tab")
+
+    def restart(self):
+        self.actions.append("browser")
+
+
+@pytest.mark.parametrize("readings, actions", [
+    ([50], []),
+    ([150, 80], ["tab"]),
+    ([150, 120, 60], ["tab", "browser"]),
+])
+def test_recycle_if_needed_escalates_from_tab_to_browser(readings, actions):
+    manager = RecordingManager(readings)
+    manager.recycle_if_needed()
+    assert manager.actions == actions
+    assert manager.readings == []
+
+
+def test_recycle_if_needed_without_limit():
+    manager = RecordingManager([10_000], memory_limit_mb=None)
+    manager.recycle_if_needed()
+    assert manager.actions == []
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Reads /proc")
+def test_process_tree_rss_of_the_test_process():
+    assert process_tree_rss(os.getpid()) > 0
+    assert process_tree_rss(2 ** 22 + 1) == 0  # No such process
@@ -0,0 +1,17 @@
+import shutil
+
+import pytest
+
+CHROME = next((shutil.which(name) for name in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser",
+                                               "chrome") if shutil.which(name)), None)
+
+pytestmark = pytest.mark.skipif(CHROME is None, reason="Chrome is not installed")
+
+
+def test_harness_subscribes_and_shares_within_budget(monkeypatch):
+    from harness.run import run_harness
+    from scheduler import scheduler
+
+    monkeypatch.setattr(scheduler, "enabled", False)
+    results = run_harness(card_count=30, share_count=3, latency=0.01, subscribe_budget=60, share_budget=30)
+    assert [(name, error) for name, _, error in results] == [("subscribe", None), ("share", None)]
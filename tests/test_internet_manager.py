@@ -0,0 +1,89 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+import internet_manager
+from internet_manager import ConnectivityMonitor, wait_for_internet
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_HEAD(self):
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def probe_server():
+    server = HTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def closed_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/"
+
+
+def test_probe_caches_online_state(probe_server, closed_url):
+    monitor = ConnectivityMonitor(probe_url=probe_server, timeout=1)
+    assert not monitor.is_online()
+    assert monitor.probe()
+    assert monitor.is_online()
+    assert monitor.online_since is not None
+
+    monitor.probe_url = closed_url
+    assert not monitor.probe()
+    assert not monitor.is_online()
+    assert monitor.online_since is None
+    monitor.session.close()
+
+
+def test_wait_until_online_times_out_while_offline(closed_url):
+    monitor = ConnectivityMonitor(probe_url=closed_url, backoff_base=0.05, backoff_max=0.1, timeout=1)
+    try:
+        assert not monitor.wait_until_online(timeout=0.3)
+    finally:
+        monitor.stop()
+
+
+def test_recheck_notices_recovered_connection(probe_server, closed_url):
+    monitor = ConnectivityMonitor(probe_url=closed_url, check_interval=60, backoff_base=60, timeout=1)
+    try:
+        monitor.start()
+        assert not monitor.wait_until_online(timeout=0.2)
+        monitor.configure(probe_server)  # Wakes the thread instead of waiting out the 60 s backoff
+        assert monitor.wait_until_online(timeout=5)
+    finally:
+        monitor.stop()
+
+
+def test_wait_for_internet_returns_when_stopped_while_offline(monkeypatch, closed_url):
+    monitor = ConnectivityMonitor(probe_url=closed_url, backoff_base=60, timeout=1)
+    monkeypatch.setattr(internet_manager, "connectivity", monitor)
+    monkeypatch.setattr(internet_manager, "STOP_CHECK_INTERVAL", 0.05)
+    stop_event = threading.Event()
+    threading.Timer(0.2, stop_event.set).start()
+    try:
+        assert not wait_for_internet(stop_event)
+    finally:
+        monitor.stop()
+
+
+def test_wait_for_internet_while_online(monkeypatch, probe_server):
+    monitor = ConnectivityMonitor(probe_url=probe_server, timeout=1)
+    monkeypatch.setattr(internet_manager, "connectivity", monitor)
+    try:
+        assert wait_for_internet(threading.Event())
+    finally:
+        monitor.stop()
@@ -0,0 +1,46 @@
+from utils import STATUS_FAILED, STATUS_SHARED, STATUS_SUBSCRIBED, SQLiteNewsletterStore, export_store_to_excel, \
+    import_excel_into_store
+
+
+def test_store_ignores_duplicate_urls(store):
+    assert store.add("https://www.linkedin.com/newsletters/a/")
+    assert not store.add("https://www.linkedin.com/newsletters/a?trk=feed")
+    assert store.add_many(["https://www.linkedin.com/newsletters/a", "https://www.linkedin.com/newsletters/b",
+                           ""]) == 1
+    assert store.count() == 2
+    assert store.contains("https://WWW.LINKEDIN.COM/newsletters/b/")
+    assert list(store.iter_urls()) == ["https://www.linkedin.com/newsletters/a/",
+                                       "https://www.linkedin.com/newsletters/b"]
+
+
+def test_store_tracks_status(store):
+    store.add_many(["https://www.linkedin.com/newsletters/a", "https://www.linkedin.com/newsletters/b"])
+    store.set_status(url="https://www.linkedin.com/newsletters/b/", status=STATUS_SHARED)
+    assert store.count(status=STATUS_SUBSCRIBED) == 1
+    assert list(store.iter_urls(status=STATUS_SHARED)) == ["https://www.linkedin.com/newsletters/b"]
+    assert store.count(status=STATUS_FAILED) == 0
+
+
+def test_store_persists_between_connections(ledger_file):
+    with SQLiteNewsletterStore(file_name=ledger_file) as store:
+        store.add("https://www.linkedin.com/newsletters/a")
+    with SQLiteNewsletterStore(file_name=ledger_file) as store:
+        assert store.contains("https://www.linkedin.com/newsletters/a/")
+
+
+def test_excel_round_trip(store, tmp_path, ledger_file):
+    excel_file = str(tmp_path / "newsletters.xlsx")
+    store.add_many(["https://www.linkedin.com/newsletters/a", "https://www.linkedin.com/newsletters/b"])
+    assert export_store_to_excel(store=store, file_name=excel_file) == 2
+
+    with SQLiteNewsletterStore(file_name=str(tmp_path / "imported.db")) as imported_store:
+        imported_store.add("https://www.linkedin.com/newsletters/a/")
+        assert import_excel_into_store(store=imported_store, file_name=excel_file) == 1
+        assert imported_store.count() == 2
+
+
+def test_store_records_attempts(store):
+    store.record_attempt(url="https://www.linkedin.com/newsletters/a/", action="share", outcome="rescheduled",
+                         failure_class="timeout", detail="TimeoutException")
+    rows = store.connection.execute("SELECT normalized_url, action, outcome, failure_class FROM attempts").fetchall()
+    assert rows == [("https://linkedin.com/newsletters/a", "share", "rescheduled", "timeout")]
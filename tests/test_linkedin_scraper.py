@@ -0,0 +1,164 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import linkedin_scraper
+import retries
+from linkedin_scraper import NewsletterSection, find_newsletter_section, retry_failed_subscriptions, \
+    subscribe_to_newsletters
+from locators import locators
+from retries import FAILURE_CLICK_INTERCEPTED, FAILURE_GONE, FAILURE_STALE_ELEMENT, FAILURE_TIMEOUT, Failure
+from utils import UrlIndex
+
+STALE = "https://linkedin.com/newsletters/stale"
+INTERCEPTED = "https://linkedin.com/newsletters/intercepted"
+TIMED_OUT = "https://linkedin.com/newsletters/timed-out"
+
+
+class StubCard:
+    def __init__(self, url, confirms):
+        self.url = url
+        self.confirms = confirms
+
+
+@pytest.fixture
+def browser(monkeypatch):
+    """
+    Stand-in of the modal: cards by URL, whether their subscription is confirmed, and the order of the clicks.
+    """
+    clock = [0.0]
+    state = SimpleNamespace(cards={}, clicks=[], sleeps=[])
+
+    def sleep(seconds):
+        state.sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(linkedin_scraper, "time", SimpleNamespace(monotonic=lambda: clock[0], sleep=sleep))
+    monkeypatch.setattr(linkedin_scraper, "wait_for_internet", lambda stop_event=None: True)
+    monkeypatch.setattr(retries, "connectivity", SimpleNamespace(recheck=lambda: None,
+                                                                   wait_until_online=lambda timeout=None: True))
+    monkeypatch.setattr(linkedin_scraper, "find_card_by_url", lambda driver, modal, url: state.cards.get(url))
+    monkeypatch.setattr(linkedin_scraper, "find_subscribe_button",
+                        lambda card: SimpleNamespace(text="Subscribe", card=card))
+    monkeypatch.setattr(linkedin_scraper, "click_element",
+                        lambda driver, button, action=None, stop_event=None: state.clicks.append(button.card.url))
+    monkeypatch.setattr(linkedin_scraper, "wait_for_subscribed", lambda driver, card: card.confirms)
+    return state
+
+
+def test_retries_in_backoff_order(browser, store):
+    for url in (STALE, INTERCEPTED, TIMED_OUT):
+        browser.cards[url] = StubCard(url, confirms=True)
+    failed_attempts = {
+        TIMED_OUT: Failure(FAILURE_TIMEOUT, "TimeoutException"),  # Retried after 2 s
+        INTERCEPTED: Failure(FAILURE_CLICK_INTERCEPTED, "ElementClickInterceptedException"),  # After 1 s
+        STALE: Failure(FAILURE_STALE_ELEMENT, "StaleElementReferenceException"),  # At once
+    }
+    subscribed = []
+
+    retry_failed_subscriptions(None, None, UrlIndex(), subscribed, failed_attempts, store=store)
+
+    assert browser.clicks == [STALE, INTERCEPTED, TIMED_OUT]
+    assert subscribed == [STALE, INTERCEPTED, TIMED_OUT]
+    assert browser.sleeps == [1, 1]
+    assert failed_attempts == {}
+    outcomes = store.connection.execute("SELECT outcome FROM attempts").fetchall()
+    assert outcomes == [("subscribed",)] * 3
+
+
+def test_gives_up_after_the_policy_attempts(browser, store):
+    browser.cards[TIMED_OUT] = StubCard(TIMED_OUT, confirms=False)
+    failed_attempts = {TIMED_OUT: Failure(FAILURE_TIMEOUT, "TimeoutException")}
+    subscribed = []
+
+    retry_failed_subscriptions(None, None, UrlIndex(), subscribed, failed_attempts, store=store)
+
+    # The first attempt failed before the retries, the policy allows 3 attempts in total
+    assert browser.clicks == [TIMED_OUT, TIMED_OUT]
+    assert browser.sleeps == [2, 4]
+    assert subscribed == []
+    assert failed_attempts == {}
+    outcomes = store.connection.execute("SELECT outcome, failure_class FROM attempts").fetchall()
+    assert outcomes == [("failed", FAILURE_TIMEOUT)] * 2 + [("given_up", FAILURE_TIMEOUT)]
+
+
+def test_gives_up_at_once_on_a_card_no_longer_listed(browser, store):
+    failed_attempts = {STALE: Failure(FAILURE_STALE_ELEMENT, "StaleElementReferenceException")}
+
+    retry_failed_subscriptions(None, None, UrlIndex(), [], failed_attempts, store=store)
+
+    assert browser.clicks == []
+    outcomes = store.connection.execute("SELECT outcome, failure_class FROM attempts").fetchall()
+    assert outcomes == [("failed", FAILURE_GONE), ("given_up", FAILURE_GONE)]
+
+
+def test_stop_event_leaves_the_remaining_failures(browser):
+    browser.cards[STALE] = StubCard(STALE, confirms=True)
+    failed_attempts = {STALE: Failure(FAILURE_STALE_ELEMENT, "StaleElementReferenceException")}
+    stop_event = threading.Event()
+    stop_event.set()
+
+    retry_failed_subscriptions(None, None, UrlIndex(), [], failed_attempts, stop_event=stop_event)
+
+    assert browser.clicks == []
+    assert STALE in failed_attempts
+
+
+def test_stop_event_cuts_the_backoff_short(browser):
+    browser.cards[TIMED_OUT] = StubCard(TIMED_OUT, confirms=True)
+    failed_attempts = {TIMED_OUT: Failure(FAILURE_TIMEOUT, "TimeoutException")}  # Retried after 2 s
+    stop_event = threading.Event()
+    threading.Timer(0.1, stop_event.set).start()
+
+    start = time.monotonic()
+    retry_failed_subscriptions(None, None, UrlIndex(), [], failed_attempts, stop_event=stop_event)
+
+    assert time.monotonic() - start < 1.5
+    assert browser.clicks == []
+    assert TIMED_OUT in failed_attempts
+
+
+class ScriptDriver:
+    """
+    Driver stand-in answering execute_script with a fixed result and recording the arguments.
+    """
+
+    def __init__(self, result):
+        self.result = result
+        self.arguments = None
+
+    def execute_script(self, script, *arguments):
+        self.arguments = arguments
+        return self.result
+
+
+def test_find_newsletter_section_returns_the_see_all_button():
+    driver = ScriptDriver(["section", "button"])
+    assert find_newsletter_section(driver) == NewsletterSection(section="section", see_all_button="button")
+    marker_selector, button_selectors = driver.arguments
+    assert "[aria-label^='Subscribe to']" in marker_selector
+    assert button_selectors == locators["see_all_button"].css_selectors()
+
+
+def test_find_newsletter_section_without_section():
+    assert find_newsletter_section(ScriptDriver(None)) is None
+
+
+def test_sweep_ends_when_chrome_goes_over_its_memory_limit(monkeypatch):
+    scrolled = []
+
+    def iter_modal_cards(driver, modal, stop_event=None):
+        for batch in range(1, 100):
+            scrolled.append(batch)
+            yield []
+
+    readings = iter([False, True])
+    driver_manager = SimpleNamespace(over_memory_limit=lambda: next(readings))
+    monkeypatch.setattr(linkedin_scraper, "MEMORY_CHECK_INTERVAL", 2)
+    monkeypatch.setattr(linkedin_scraper, "open_newsletter_modal", lambda driver, base_url, stop_event: "modal")
+    monkeypatch.setattr(linkedin_scraper, "iter_modal_cards", iter_modal_cards)
+
+    assert subscribe_to_newsletters(None, UrlIndex(), driver_manager=driver_manager) == []
+    assert scrolled == [1, 2, 3, 4]
@@ -0,0 +1,147 @@
+import threading
+
+import pytest
+from selenium.common import NoSuchElementException, TimeoutException
+from selenium.webdriver.common.by import By
+
+import locators
+from locators import LocatorChain, LocatorRegistry, Selector
+
+
+class StubContext:
+    """
+    Driver stand-in answering find_element for a set of matching selector values.
+    """
+
+    def __init__(self, matching):
+        self.matching = set(matching)
+        self.calls = []
+
+    def find_element(self, by, value):
+        self.calls.append(value)
+        if value in self.matching:
+            return StubElement(value)
+        raise NoSuchElementException(value)
+
+
+class StubElement:
+    def __init__(self, value, displayed=True):
+        self.value = value
+        self.displayed = displayed
+
+    def is_displayed(self):
+        return self.displayed
+
+    def is_enabled(self):
+        return True
+
+
+def make_chain():
+    return LocatorChain("control", [Selector(By.ID, "fast"), Selector(By.CSS_SELECTOR, "scoped"),
+                                    Selector(By.XPATH, "broad")])
+
+
+def test_find_caches_the_selector_that_matched():
+    chain = make_chain()
+    context = StubContext({"scoped", "broad"})
+
+    assert chain.find(context).value == "scoped"
+    assert context.calls == ["fast", "scoped"]
+    assert chain.preferred == 1
+
+    context.calls.clear()
+    assert chain.find(context).value == "scoped"
+    assert context.calls == ["scoped"]
+
+
+def test_find_falls_back_when_the_preferred_selector_dies():
+    chain = make_chain()
+    chain.find(StubContext({"scoped"}))
+
+    context = StubContext({"fast"})
+    assert chain.find(context).value == "fast"
+    assert context.calls == ["scoped", "fast"]
+    assert chain.preferred == 0
+
+
+def test_find_raises_when_no_selector_matches():
+    chain = make_chain()
+    with pytest.raises(NoSuchElementException):
+        chain.find(StubContext(set()))
+    assert [selector["misses"] for selector in chain.stats()] == [1, 1, 1]
+    assert all(selector["mean_miss_ms"] is not None for selector in chain.stats())
+    assert chain.preferred == 0
+
+
+def test_stats_count_hits_and_misses():
+    chain = make_chain()
+    context = StubContext({"scoped"})
+    chain.find(context)
+    chain.find(context)
+
+    fast, scoped, broad = chain.stats()
+    assert (fast["hits"], fast["misses"], fast["hit_rate"], fast["mean_lookup_ms"]) == (0, 1, 0.0, None)
+    assert fast["mean_miss_ms"] is not None
+    assert (scoped["hits"], scoped["misses"], scoped["hit_rate"], scoped["mean_miss_ms"]) == (2, 0, 1.0, None)
+    assert scoped["mean_lookup_ms"] is not None
+    assert (broad["hits"], broad["misses"], broad["hit_rate"]) == (0, 0, None)
+    assert scoped["selector"] == "css selector=scoped"
+
+
+def test_wait_clickable_polls_only_the_preferred_selector():
+    chain = make_chain()
+    chain.find(StubContext({"scoped"}))
+    context = StubContext(set())
+    appear = threading.Timer(0.3, lambda: context.matching.add("scoped"))
+    appear.start()
+
+    assert chain.wait_clickable(context, description="control", timeout=5).value == "scoped"
+    assert len(context.calls) > 1
+    assert set(context.calls) == {"scoped"}
+    # Recorded once for the whole wait, not once per poll
+    assert [(selector["hits"], selector["misses"]) for selector in chain.stats()] == [(0, 1), (2, 0), (0, 0)]
+
+
+def test_wait_clickable_falls_back_after_the_timeout(monkeypatch):
+    monkeypatch.setattr(locators, "FALLBACK_TIMEOUT", 1)
+    chain = make_chain()
+    chain.find(StubContext({"scoped"}))
+    context = StubContext({"broad"})
+
+    assert chain.wait_clickable(context, description="control", timeout=0.3).value == "broad"
+    assert context.calls[-2:] == ["fast", "broad"]
+    assert chain.preferred == 2
+    fast, scoped, broad = chain.stats()
+    assert (fast["misses"], scoped["misses"], broad["hits"]) == (2, 1, 1)
+
+
+def test_wait_clickable_times_out_when_no_selector_matches(monkeypatch):
+    monkeypatch.setattr(locators, "FALLBACK_TIMEOUT", 0.2)
+    chain = make_chain()
+    with pytest.raises(TimeoutException):
+        chain.wait_clickable(StubContext(set()), description="control", timeout=0.2)
+    assert [selector["misses"] for selector in chain.stats()] == [1, 1, 1]
+    assert chain.preferred == 0
+
+
+def test_wait_clickable_ignores_hidden_elements(monkeypatch):
+    monkeypatch.setattr(locators, "FALLBACK_TIMEOUT", 0.2)
+    chain = make_chain()
+    context = StubContext({"fast"})
+    context.find_element = lambda by, value: StubElement(value, displayed=False)
+    with pytest.raises(TimeoutException):
+        chain.wait_clickable(context, description="control", timeout=0.2)
+
+
+def test_registry_stats_by_control():
+    registry = LocatorRegistry({"a": [Selector(By.ID, "x")], "b": [Selector(By.ID, "y")]})
+    registry["a"].find(StubContext({"x"}))
+    assert registry.stats()["a"][0]["hits"] == 1
+    assert registry.stats()["b"][0]["hits"] == 0
+
+
+def test_repost_item_scans_the_whole_document_only_as_last_resort():
+    selectors = locators.locators["repost_item"].selectors
+    assert selectors[-1].value == "//*[text()='Repost to Feed']"
+    assert all("@role='menu'" in selector.value or "artdeco-dropdown__content" in selector.value
+               for selector in selectors[:-1])
@@ -0,0 +1,74 @@
+import io
+import json
+
+import pytest
+
+from metrics import MEMORY_BUCKETS_MB, Metrics
+
+
+@pytest.fixture
+def metrics():
+    registry = Metrics()
+    registry.configure(enabled=True)
+    registry.log_stream = io.StringIO()
+    return registry
+
+
+def test_disabled_metrics_record_nothing():
+    registry = Metrics()
+    registry.increment("shares_total", outcome="shared")
+    registry.observe("wait_seconds", 1.0)
+    with registry.span("cycle") as fields:
+        fields["subscribed"] = 1
+    assert registry.counters == {}
+    assert registry.histograms == {}
+
+
+def test_render_prometheus_counters_and_histograms(metrics):
+    metrics.increment("shares_total", outcome="shared")
+    metrics.increment("shares_total", 2, outcome="shared")
+    metrics.increment("shares_total", outcome="failed", error='Time"out')
+    metrics.observe("wait_seconds", 0.2, condition="modal")
+    metrics.observe("wait_seconds", 42, condition="modal")
+
+    lines = metrics.render_prometheus().splitlines()
+    assert "# TYPE shares_total counter" in lines
+    assert 'shares_total{outcome="shared"} 3' in lines
+    assert 'shares_total{error="Time\\"out",outcome="failed"} 1' in lines
+    assert "# TYPE wait_seconds histogram" in lines
+    assert 'wait_seconds_bucket{condition="modal",le="0.1"} 0' in lines
+    assert 'wait_seconds_bucket{condition="modal",le="0.25"} 1' in lines
+    assert 'wait_seconds_bucket{condition="modal",le="60"} 2' in lines
+    assert 'wait_seconds_bucket{condition="modal",le="+Inf"} 2' in lines
+    assert 'wait_seconds_sum{condition="modal"} 42.2' in lines
+    assert 'wait_seconds_count{condition="modal"} 2' in lines
+
+
+def test_observe_with_custom_buckets(metrics):
+    metrics.observe("browser_memory_mb", 640, buckets=MEMORY_BUCKETS_MB)
+    lines = metrics.render_prometheus().splitlines()
+    assert 'browser_memory_mb_bucket{le="500"} 0' in lines
+    assert 'browser_memory_mb_bucket{le="750"} 1' in lines
+    assert 'browser_memory_mb_bucket{le="4000"} 1' in lines
+
+
+def test_span_records_duration_and_emits_fields(metrics):
+    with pytest.raises(RuntimeError):
+        with metrics.span("stage", stage="share") as fields:
+            fields["shared"] = 3
+            raise RuntimeError("boom")
+
+    record = json.loads(metrics.log_stream.getvalue())
+    assert record["event"] == "span"
+    assert record["name"] == "stage"
+    assert record["stage"] == "share"
+    assert record["shared"] == 3
+    assert record["status"] == "error"
+    assert "stage_seconds" in metrics.render_prometheus()
+
+
+def test_write_prometheus(metrics, tmp_path):
+    metrics.increment("subscriptions_total", outcome="subscribed")
+    prometheus_file = tmp_path / "metrics.prom"
+    metrics.write_prometheus(file_name=str(prometheus_file))
+    assert 'subscriptions_total{outcome="subscribed"} 1' in prometheus_file.read_text(encoding="utf-8")
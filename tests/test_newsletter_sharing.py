@@ -0,0 +1,103 @@
+import io
+
+import pytest
+
+import newsletter_sharing
+from metrics import Metrics
+from newsletter_sharing import process_share_queue
+from retries import FAILURE_ALREADY_DONE, FAILURE_GONE, FAILURE_TIMEOUT, Failure
+from share_queue import STATE_DEAD, STATE_DONE, STATE_PENDING, ShareQueue
+from utils import STATUS_FAILED, STATUS_SHARED
+
+SHARED = "https://linkedin.com/newsletters/shared"
+TIMED_OUT = "https://linkedin.com/newsletters/timed-out"
+GONE = "https://linkedin.com/newsletters/gone"
+ALREADY_REPOSTED = "https://linkedin.com/newsletters/already-reposted"
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    registry = Metrics()
+    registry.configure(enabled=True)
+    registry.log_stream = io.StringIO()
+    monkeypatch.setattr(newsletter_sharing, "metrics", registry)
+    return registry
+
+
+class StubDriverManager:
+    """
+    Stand-in of the DriverManager, handing out a new driver at each health check.
+    """
+
+    def __init__(self):
+        self.checks = 0
+
+    def get_driver(self):
+        self.checks += 1
+        return f"driver {self.checks}"
+
+
+@pytest.fixture
+def share_queue(ledger_file):
+    with ShareQueue(file_name=ledger_file) as queue:
+        yield queue
+
+
+@pytest.fixture
+def outcomes_by_url(monkeypatch, metrics):
+    """
+    Replace the browser work of a share with a scripted outcome per URL, counted the way share_newsletter counts it.
+    """
+    failures = {TIMED_OUT: Failure(FAILURE_TIMEOUT, "TimeoutException"), GONE: Failure(FAILURE_GONE, "Page not found"),
+                ALREADY_REPOSTED: Failure(FAILURE_ALREADY_DONE, "TimeoutException")}
+
+    def share_newsletter(driver, url, stop_event=None):
+        if url not in failures:
+            metrics.increment("shares_total", outcome="shared")
+        return failures.get(url)
+
+    monkeypatch.setattr(newsletter_sharing, "share_newsletter", share_newsletter)
+
+
+def test_each_share_is_counted_once(outcomes_by_url, metrics, store, share_queue):
+    store.add_many([SHARED, TIMED_OUT, GONE])
+    share_queue.enqueue([SHARED, TIMED_OUT, GONE])
+
+    assert process_share_queue(StubDriverManager(), share_queue, store) == {"shared": 1, "already_shared": 0,
+                                                                            "rescheduled": 1, "given_up": 1}
+
+    shares = {dict(labels)["outcome"]: value for (name, labels), value in metrics.counters.items()
+              if name == "shares_total"}
+    assert shares == {"shared": 1, "rescheduled": 1, "given_up": 1}
+    assert share_queue.counts() == {STATE_DONE: 1, STATE_PENDING: 1, STATE_DEAD: 1}
+    assert store.count(status=STATUS_SHARED) == 1
+    assert store.count(status=STATUS_FAILED) == 2
+
+
+def test_driver_is_fetched_again_every_few_jobs(monkeypatch, store, share_queue):
+    drivers = []
+
+    def share_claimed_job(driver, share_queue, store, url):
+        drivers.append(driver)
+        share_queue.mark_done(url)
+        return "shared"
+
+    monkeypatch.setattr(newsletter_sharing, "share_claimed_job", share_claimed_job)
+    share_queue.enqueue([f"https://linkedin.com/newsletters/n{i}" for i in range(5)])
+    driver_manager = StubDriverManager()
+
+    process_share_queue(driver_manager, share_queue, store, memory_check_interval=2)
+
+    assert drivers == ["driver 1", "driver 1", "driver 2", "driver 2", "driver 3"]
+
+
+def test_already_reposted_job_is_closed_as_shared(outcomes_by_url, metrics, store, share_queue):
+    store.add(ALREADY_REPOSTED)
+    share_queue.enqueue([ALREADY_REPOSTED])
+
+    assert process_share_queue(StubDriverManager(), share_queue, store)["already_shared"] == 1
+
+    assert share_queue.counts() == {STATE_DONE: 1}
+    assert store.count(status=STATUS_SHARED) == 1
+    outcomes = store.connection.execute("SELECT outcome, failure_class FROM attempts").fetchall()
+    assert outcomes == [("already_shared", FAILURE_ALREADY_DONE)]
@@ -0,0 +1,124 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import pipeline
+from config import Config
+from pipeline import Discovery, Pipeline
+from scheduler import scheduler
+from share_queue import STATE_DONE, ShareQueue
+from utils import SQLiteNewsletterStore
+
+URLS = [f"https://www.linkedin.com/newsletters/n{i}" for i in range(5)]
+
+
+class StubDriverManager:
+    """
+    Stand-in of the DriverManager of a stage, without a browser.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.quit_count = 0
+
+    def get_driver(self) -> object:
+        return object()
+
+    def quit(self) -> None:
+        self.quit_count += 1
+
+
+def wait_for(condition, timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def stub_stages(monkeypatch):
+    """
+    Replace the browser work of both stages: the sweep subscribes to URLS once, sharing always succeeds.
+
+    :return: Namespace of the URLs shared, in order, and of the keyword arguments of each sweep
+    """
+    shared = []
+    sweeps = []
+
+    def subscribe_to_newsletters(driver, url_index, on_subscribed=None, stop_event=None, **kwargs):
+        sweeps.append(kwargs)
+        urls = [url for url in URLS if url not in url_index] if len(sweeps) == 1 else []
+        for url in urls:
+            on_subscribed(url)
+        return urls
+
+    def share_claimed_job(driver, share_queue, store, url, stop_event=None):
+        share_queue.mark_done(url)
+        shared.append(url)
+        return "shared"
+
+    monkeypatch.setattr(pipeline, "create_driver_manager", StubDriverManager)
+    monkeypatch.setattr(pipeline, "wait_for_internet", lambda stop_event=None: True)
+    monkeypatch.setattr(pipeline, "login_with_cookies", lambda *args, **kwargs: None)
+    monkeypatch.setattr(pipeline, "subscribe_to_newsletters", subscribe_to_newsletters)
+    monkeypatch.setattr(pipeline, "share_claimed_job", share_claimed_job)
+    monkeypatch.setattr(scheduler, "enabled", False)
+    return SimpleNamespace(shared=shared, sweeps=sweeps)
+
+
+def test_discoveries_are_shared_and_saved(stub_stages, ledger_file):
+    stages = Pipeline(Config(ledger_file=ledger_file, max_new=10), queue_size=2)
+    stages.start()
+    try:
+        wait_for(lambda: len(stub_stages.shared) == len(URLS))
+    finally:
+        stages.stop()
+
+    assert sorted(stub_stages.shared) == URLS
+    assert stub_stages.sweeps[0]["max_new"] == 10
+    assert stages.scraper_manager.quit_count == stages.sharer_manager.quit_count == 1
+    with SQLiteNewsletterStore(file_name=ledger_file) as store, ShareQueue(file_name=ledger_file) as share_queue:
+        assert store.count() == len(URLS)
+        assert share_queue.counts() == {STATE_DONE: len(URLS)}
+
+
+def test_full_queue_blocks_the_scraper_until_consumed(stub_stages, ledger_file):
+    stages = Pipeline(Config(ledger_file=ledger_file), queue_size=1)
+    stages._offer(Discovery(url=URLS[0], discovered_at=time.monotonic()))
+    offer = threading.Thread(target=stages._offer, args=(Discovery(url=URLS[1], discovered_at=time.monotonic()),))
+    offer.start()
+    time.sleep(0.3)
+    assert offer.is_alive()
+
+    assert stages.discoveries.get_nowait().url == URLS[0]
+    offer.join(timeout=2)
+    assert not offer.is_alive()
+    assert stages.discoveries.get_nowait().url == URLS[1]
+
+
+def test_stop_releases_a_blocked_scraper(stub_stages, ledger_file):
+    stages = Pipeline(Config(ledger_file=ledger_file), queue_size=1)
+    stages._offer(Discovery(url=URLS[0], discovered_at=time.monotonic()))
+    offer = threading.Thread(target=stages._offer, args=(Discovery(url=URLS[1], discovered_at=time.monotonic()),))
+    offer.start()
+    stages.stop_event.set()
+    offer.join(timeout=2)
+    assert not offer.is_alive()
+    assert stages.discoveries.qsize() == 1
+
+
+def test_stop_returns_while_offline(stub_stages, ledger_file, monkeypatch):
+    # Offline until the pipeline stops
+    monkeypatch.setattr(pipeline, "wait_for_internet", lambda stop_event=None: not stop_event.wait())
+    stages = Pipeline(Config(ledger_file=ledger_file), queue_size=2)
+    with ShareQueue(file_name=ledger_file) as share_queue:
+        share_queue.enqueue(URLS[:1])  # Due, so the sharing stage waits for the connection too
+    stages.start()
+    time.sleep(0.2)
+    stop = threading.Thread(target=stages.stop)
+    stop.start()
+    stop.join(timeout=5)
+    assert not stop.is_alive()
+    assert stub_stages.sweeps == []
+    assert stub_stages.shared == []
@@ -0,0 +1,79 @@
+import pytest
+from selenium.common import ElementClickInterceptedException, NoSuchElementException, \
+    StaleElementReferenceException, TimeoutException, WebDriverException
+
+import retries
+from retries import FAILURE_CLICK_INTERCEPTED, FAILURE_CONNECTIVITY, FAILURE_MISSING_ELEMENT, \
+    FAILURE_STALE_ELEMENT, FAILURE_TIMEOUT, FAILURE_UNKNOWN, SHARE_POLICIES, SUBSCRIBE_POLICIES, RetryPolicy, \
+    classify_failure
+
+
+class FakeConnectivity:
+    """
+    Stand-in of the connectivity monitor with a fixed state, recording the rechecks and waits.
+    """
+
+    def __init__(self, online: bool) -> None:
+        self.online = online
+        self.rechecks = 0
+        self.wait_timeouts = []
+
+    def probe(self) -> bool:
+        raise AssertionError("Only the background thread of the monitor probes")
+
+    def recheck(self) -> None:
+        self.rechecks += 1
+
+    def wait_until_online(self, timeout: float | None = None) -> bool:
+        self.wait_timeouts.append(timeout)
+        return self.online
+
+
+@pytest.fixture
+def online(monkeypatch):
+    monitor = FakeConnectivity(online=True)
+    monkeypatch.setattr(retries, "connectivity", monitor)
+    return monitor
+
+
+@pytest.mark.parametrize("error, failure_class", [
+    (StaleElementReferenceException("stale"), FAILURE_STALE_ELEMENT),
+    (ElementClickInterceptedException("intercepted"), FAILURE_CLICK_INTERCEPTED),
+    (TimeoutException("timeout"), FAILURE_TIMEOUT),
+    (NoSuchElementException("missing"), FAILURE_MISSING_ELEMENT),
+    (WebDriverException("unknown error: net::ERR_INTERNET_DISCONNECTED"), FAILURE_CONNECTIVITY),
+    (ValueError("other"), FAILURE_UNKNOWN),
+])
+def test_classify_failure_while_online(online, error, failure_class):
+    failure = classify_failure(error)
+    assert failure.failure_class == failure_class
+    assert failure.detail.startswith(error.__class__.__name__)
+
+
+def test_classify_failure_asks_the_monitor_without_blocking(monkeypatch):
+    monitor = FakeConnectivity(online=False)
+    monkeypatch.setattr(retries, "connectivity", monitor)
+    assert classify_failure(TimeoutException("timeout")).failure_class == FAILURE_CONNECTIVITY
+    assert monitor.rechecks == 1
+    assert monitor.wait_timeouts == [retries.OFFLINE_GRACE]
+    # Failures fixed by locating the element again do not depend on the connection
+    assert classify_failure(StaleElementReferenceException("stale")).failure_class == FAILURE_STALE_ELEMENT
+    assert monitor.rechecks == 1
+
+
+def test_retry_policy_delay_doubles_up_to_the_maximum():
+    policy = RetryPolicy(max_attempts=5, backoff_base=2, backoff_max=10)
+    assert [policy.delay(attempts) for attempts in range(1, 6)] == [2, 4, 8, 10, 10]
+    assert not policy.permanent
+    assert RetryPolicy(max_attempts=0, backoff_base=0, backoff_max=0).permanent
+
+
+def test_every_failure_class_has_a_policy():
+    failure_classes = {value for name, value in vars(retries).items() if name.startswith("FAILURE_")}
+    assert set(SUBSCRIBE_POLICIES) == failure_classes
+    assert set(SHARE_POLICIES) == failure_classes
+
+
+def test_permanent_share_failures_are_never_retried():
+    assert SHARE_POLICIES[retries.FAILURE_GONE].permanent
+    assert SHARE_POLICIES[retries.FAILURE_ALREADY_DONE].permanent
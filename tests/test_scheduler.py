@@ -0,0 +1,62 @@
+import pytest
+
+from scheduler import Scheduler, TokenBucket
+
+
+def test_token_bucket_allows_burst_then_paces(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("scheduler.time.monotonic", lambda: now[0])
+    bucket = TokenBucket(rate=2, capacity=3)
+
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)  # Waits for the previous reservation too
+
+    now[0] += 10  # Refilled up to the capacity, not beyond
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    assert bucket.reserve() == pytest.approx(0.5)
+
+
+def test_token_bucket_utilization(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("scheduler.time.monotonic", lambda: now[0])
+    bucket = TokenBucket(rate=1, capacity=2)
+    bucket.reserve()
+    now[0] += 2
+    assert bucket.utilization() == pytest.approx(1 / 4)
+
+
+def test_scheduler_acquire_skips_unknown_and_disabled_actions(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("scheduler.time.sleep", sleeps.append)
+    scheduler = Scheduler({"click": {"rate_per_minute": 60, "burst": 1}})
+
+    assert scheduler.acquire("unknown") == 0
+    assert scheduler.acquire("click") == 0
+    assert scheduler.acquire("click") > 0
+    assert len(sleeps) == 1
+
+    scheduler.disable()
+    assert scheduler.acquire("click") == 0
+    assert len(sleeps) == 1
+
+
+@pytest.mark.parametrize("limit", [{"rate_per_minute": 0}, {"rate_per_minute": -1},
+                                   {"rate_per_minute": 10, "burst": 0}])
+def test_scheduler_rejects_invalid_limits(limit):
+    scheduler = Scheduler()
+    before = scheduler.buckets["click"]
+    with pytest.raises(ValueError):
+        scheduler.configure({"scroll": {"rate_per_minute": 10}, "click": limit})
+    assert scheduler.buckets["click"] is before
+
+
+def test_scheduler_load_keeps_defaults_of_unlisted_actions(tmp_path):
+    pacing_file = tmp_path / "pacing.json"
+    pacing_file.write_text('{"click": {"rate_per_minute": 120, "burst": 2}}', encoding="utf-8")
+    scheduler = Scheduler()
+    scroll = scheduler.buckets["scroll"]
+    scheduler.load(file_name=str(pacing_file))
+    assert scheduler.buckets["click"].rate == 2
+    assert scheduler.buckets["click"].capacity == 2
+    assert scheduler.buckets["scroll"] is scroll
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from share_queue import STATE_DEAD, STATE_DONE, STATE_IN_PROGRESS, STATE_PENDING, ShareQueue
+
+URL = "https://www.linkedin.com/newsletters/a/"
+
+
+@pytest.fixture
+def share_queue(ledger_file):
+    with ShareQueue(file_name=ledger_file, backoff_base=10, backoff_max=25, max_attempts=3) as queue:
+        yield queue
+
+
+def job_row(share_queue):
+    """
+    :return: Attempts, next eligible time and last error of the only job of the queue
+    """
+    return share_queue.connection.execute("SELECT attempts, next_eligible_at, last_error FROM share_jobs").fetchone()
+
+
+def test_enqueue_ignores_queued_urls(share_queue):
+    assert share_queue.enqueue(urls=[URL, "https://www.linkedin.com/newsletters/a?trk=feed"]) == 1
+    assert share_queue.counts() == {STATE_PENDING: 1}
+
+
+def test_claimed_job_is_done_once_shared(share_queue):
+    share_queue.enqueue(urls=[URL])
+    assert share_queue.claim_next() == URL
+    assert share_queue.claim_next() is None
+    share_queue.mark_done(URL)
+    assert share_queue.counts() == {STATE_DONE: 1}
+
+
+def test_mark_failed_backs_off_exponentially_then_gives_up(share_queue):
+    share_queue.enqueue(urls=[URL])
+    delays = []
+    for _ in range(2):
+        share_queue.claim_next()
+        before = time.time()
+        assert share_queue.mark_failed(URL, "TimeoutException")
+        delays.append(job_row(share_queue)[1] - before)
+        assert share_queue.claim_next() is None  # Not due before its backoff ends
+        share_queue.connection.execute("UPDATE share_jobs SET next_eligible_at = 0")
+    assert delays[0] == pytest.approx(10, abs=1)
+    assert delays[1] == pytest.approx(20, abs=1)
+
+    share_queue.claim_next()
+    assert not share_queue.mark_failed(URL, "TimeoutException")
+    assert share_queue.counts() == {STATE_DEAD: 1}
+
+
+def test_mark_failed_caps_the_backoff(share_queue):
+    share_queue.enqueue(urls=[URL])
+    share_queue.connection.execute("UPDATE share_jobs SET attempts = 1")
+    before = time.time()
+    share_queue.mark_failed(URL, "TimeoutException")
+    attempts, next_eligible_at, last_error = job_row(share_queue)
+    assert next_eligible_at - before == pytest.approx(20, abs=1)
+    share_queue.connection.execute("UPDATE share_jobs SET attempts = 0")
+    share_queue.backoff_base = 100
+    share_queue.mark_failed(URL, "NoSuchElementException")
+    attempts, next_eligible_at, last_error = job_row(share_queue)
+    assert next_eligible_at - before == pytest.approx(25, abs=1)
+    assert attempts == 1
+    assert last_error == "NoSuchElementException"
+
+
+def test_mark_failed_takes_the_policy_of_the_failure(share_queue):
+    share_queue.enqueue(urls=[URL])
+    share_queue.claim_next()
+    before = time.time()
+    assert share_queue.mark_failed(URL, "TimeoutException", backoff_base=60, backoff_max=600, max_attempts=5)
+    assert job_row(share_queue)[1] - before == pytest.approx(60, abs=1)
+
+
+def test_mark_failed_gives_up_at_once_without_retries(share_queue):
+    share_queue.enqueue(urls=[URL])
+    share_queue.claim_next()
+    assert not share_queue.mark_failed(URL, "Page not found", max_attempts=0)
+    assert share_queue.counts() == {STATE_DEAD: 1}
+
+
+def test_interrupted_jobs_are_resumed(ledger_file):
+    with ShareQueue(file_name=ledger_file) as queue:
+        queue.enqueue(urls=[URL])
+        queue.claim_next()
+        assert queue.counts() == {STATE_IN_PROGRESS: 1}
+    with ShareQueue(file_name=ledger_file) as queue:
+        assert queue.claim_next() == URL
@@ -0,0 +1,33 @@
+from utils import UrlIndex, normalize_url
+
+
+def test_normalize_url_maps_variants_to_one_address():
+    expected = "https://linkedin.com/newsletters/python-weekly-123"
+    for url in [
+        "https://www.linkedin.com/newsletters/python-weekly-123/",
+        "http://www.linkedin.com/newsletters/python-weekly-123",
+        "https://uk.linkedin.com/newsletters/python-weekly-123/?trk=feed#comments",
+        "  https://WWW.LinkedIn.com/newsletters/python-weekly-123//  ",
+    ]:
+        assert normalize_url(url) == expected
+
+
+def test_normalize_url_keeps_non_default_port():
+    assert normalize_url("http://127.0.0.1:8000/newsletters/a/") == "https://127.0.0.1:8000/newsletters/a"
+
+
+def test_url_index_deduplicates_normalized_urls():
+    index = UrlIndex(["https://www.linkedin.com/newsletters/a/", None, ""])
+    assert len(index) == 1
+    assert "https://linkedin.com/newsletters/a?trk=x" in index
+    assert None not in index
+    assert not index.add("http://linkedin.com/newsletters/a")
+    assert index.add("https://linkedin.com/newsletters/b")
+    assert len(index) == 2
+
+
+def test_url_index_from_store(store):
+    store.add_many(["https://www.linkedin.com/newsletters/a/", "https://uk.linkedin.com/newsletters/b/"])
+    index = UrlIndex.from_store(store=store)
+    assert len(index) == 2
+    assert "https://linkedin.com/newsletters/b" in index
@@ -1,24 +1,331 @@
 """
-Utility functions for saving and loading newsletter URLs to and from an Excel file.
+Utility functions and storage backends for the ledger of newsletter URLs.
+
+The ledger lives in an indexed SQLite database so that each cycle only touches the rows it changes. The Excel
+workbook is kept as an interchange format and can be exported from or imported into the ledger.
 """
+import argparse
 import os
-from typing import List
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Set
+from urllib.parse import urlsplit, urlunsplit
+
+if TYPE_CHECKING:
+    # openpyxl is imported by the Excel functions only, so that ledger commands start fast
+    from openpyxl import Workbook
+    from openpyxl.worksheet.worksheet import Worksheet
+
+DEFAULT_LEDGER_FILE = "newsletters.db"
+DEFAULT_EXCEL_FILE = "subscribed_newsletters.xlsx"
+
+STATUS_SUBSCRIBED = "subscribed"
+STATUS_SHARED = "shared"
+STATUS_FAILED = "failed"
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a newsletter URL so that variants of the same address map to a single ledger row.
+
+    The scheme is forced to https, the host is lower-cased with "www." and LinkedIn country subdomains removed, the
+    query string (tracking parameters) and fragment are dropped and trailing slashes are removed.
+
+    :param url: URL to normalize
+    :return: Normalized URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = "https" if parts.scheme.lower() in ("http", "https", "") else parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    elif host.endswith(".linkedin.com") and len(host) == len("xx.linkedin.com"):
+        host = "linkedin.com"  # Country subdomains such as uk.linkedin.com serve the same pages
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/")
+    return urlunsplit((scheme, host, path, "", ""))
+
+
+class UrlIndex:
+    """
+    Set of normalized newsletter URLs with constant-time membership checks and inserts.
+    """
+
+    def __init__(self, urls: Iterable[str] = ()) -> None:
+        """
+        :param urls: URLs to add to the index
+        """
+        self._normalized_urls: Set[str] = {normalize_url(url) for url in urls if url}
+
+    @classmethod
+    def from_store(cls, store: "NewsletterStore") -> "UrlIndex":
+        """
+        Build the index from the ledger, streaming the already normalized URLs without an intermediate list.
+
+        :param store: NewsletterStore to load the URLs from
+        :return: UrlIndex instance
+        """
+        index = cls()
+        index._normalized_urls.update(store.iter_normalized_urls())
+        return index
+
+    def add(self, url: str) -> bool:
+        """
+        Add a URL to the index.
+
+        :param url: Newsletter URL
+        :return: True if the URL was added, False if it was already in the index
+        """
+        normalized_url = normalize_url(url)
+        if normalized_url in self._normalized_urls:
+            return False
+        self._normalized_urls.add(normalized_url)
+        return True
+
+    def __contains__(self, url: object) -> bool:
+        return isinstance(url, str) and normalize_url(url) in self._normalized_urls
+
+    def __len__(self) -> int:
+        return len(self._normalized_urls)
+
+
+class NewsletterStore(ABC):
+    """
+    Storage backend for the ledger of newsletter URLs and their subscription/sharing status.
+    """
+
+    @abstractmethod
+    def add(self, url: str, status: str = STATUS_SUBSCRIBED) -> bool:
+        """
+        Add a URL to the ledger.
+
+        :param url: Newsletter URL
+        :param status: Initial status of the URL
+        :return: True if the URL was added, False if it was already in the ledger
+        """
+
+    @abstractmethod
+    def add_many(self, urls: Iterable[str], status: str = STATUS_SUBSCRIBED) -> int:
+        """
+        Add several URLs to the ledger in a single transaction.
+
+        :param urls: Newsletter URLs
+        :param status: Initial status of the URLs
+        :return: Number of URLs that were added
+        """
+
+    @abstractmethod
+    def contains(self, url: str) -> bool:
+        """
+        Check whether a URL is already in the ledger.
+
+        :param url: Newsletter URL
+        :return: True if the URL is in the ledger
+        """
+
+    @abstractmethod
+    def set_status(self, url: str, status: str) -> None:
+        """
+        Update the status of a URL in the ledger.
+
+        :param url: Newsletter URL
+        :param status: New status of the URL
+        """
+
+    @abstractmethod
+    def iter_urls(self, status: str | None = None) -> Iterator[str]:
+        """
+        Iterate over the URLs in the ledger in insertion order.
+
+        :param status: Only yield URLs with this status, if given
+        :return: Iterator of newsletter URLs
+        """
+
+    @abstractmethod
+    def record_attempt(self, url: str, action: str, outcome: str, failure_class: str | None = None,
+                       detail: str | None = None) -> None:
+        """
+        Record an attempt to subscribe to or share a newsletter, successful or not.
+
+        :param url: Newsletter URL
+        :param action: "subscribe" or "share"
+        :param outcome: Outcome of the attempt, e.g. "subscribed", "shared", "rescheduled" or "given_up"
+        :param failure_class: Class of the failure, if the attempt failed
+        :param detail: Description of the failure, if the attempt failed
+        """
+
+    def iter_normalized_urls(self) -> Iterator[str]:
+        """
+        Iterate over the normalized form of every URL in the ledger.
+
+        :return: Iterator of normalized newsletter URLs
+        """
+        for url in self.iter_urls():
+            yield normalize_url(url)
+
+    @abstractmethod
+    def count(self, status: str | None = None) -> int:
+        """
+        Count the URLs in the ledger.
+
+        :param status: Only count URLs with this status, if given
+        :return: Number of URLs
+        """
+
+    def close(self) -> None:
+        """
+        Release any resources held by the store.
+        """
+
+    def __enter__(self) -> "NewsletterStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class SQLiteNewsletterStore(NewsletterStore):
+    """
+    Newsletter ledger backed by a SQLite database with a unique index on the normalized URL.
+    """
 
-import openpyxl
-from openpyxl import Workbook
-from openpyxl.worksheet.worksheet import Worksheet
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS newsletters (
+            id INTEGER PRIMARY KEY,
+            url TEXT NOT NULL,
+            normalized_url TEXT NOT NULL,
+            status TEXT NOT NULL,
+            subscribed_at REAL,
+            shared_at REAL,
+            failed_at REAL,
+            updated_at REAL NOT NULL
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_newsletters_normalized_url ON newsletters (normalized_url);
+        CREATE INDEX IF NOT EXISTS idx_newsletters_status ON newsletters (status);
+        CREATE TABLE IF NOT EXISTS attempts (
+            id INTEGER PRIMARY KEY,
+            url TEXT NOT NULL,
+            normalized_url TEXT NOT NULL,
+            action TEXT NOT NULL,
+            outcome TEXT NOT NULL,
+            failure_class TEXT,
+            detail TEXT,
+            attempted_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_attempts_normalized_url ON attempts (normalized_url);
+    """
+
+    # Timestamp column that is set when a URL enters each status
+    _STATUS_COLUMNS = {
+        STATUS_SUBSCRIBED: "subscribed_at",
+        STATUS_SHARED: "shared_at",
+        STATUS_FAILED: "failed_at",
+    }
+
+    def __init__(self, file_name: str = DEFAULT_LEDGER_FILE) -> None:
+        """
+        Open (and create, if needed) the ledger database.
+
+        :param file_name: Path of the SQLite database file
+        """
+        self.file_name = file_name
+        self.connection = sqlite3.connect(file_name)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self._SCHEMA)
+
+    def _status_column(self, status: str) -> str:
+        if status not in self._STATUS_COLUMNS:
+            raise ValueError(f"Unknown newsletter status: {status}")
+        return self._STATUS_COLUMNS[status]
+
+    def _insert(self, url: str, status: str, now: float) -> bool:
+        column = self._status_column(status)
+        cursor = self.connection.execute(
+            f"INSERT OR IGNORE INTO newsletters (url, normalized_url, status, {column}, updated_at) "
+            f"VALUES (?, ?, ?, ?, ?)",
+            (url, normalize_url(url), status, now, now))
+        return cursor.rowcount == 1
+
+    def add(self, url: str, status: str = STATUS_SUBSCRIBED) -> bool:
+        with self.connection:
+            return self._insert(url, status, time.time())
+
+    def add_many(self, urls: Iterable[str], status: str = STATUS_SUBSCRIBED) -> int:
+        now = time.time()
+        added = 0
+        with self.connection:
+            for url in urls:
+                if url:
+                    added += self._insert(url, status, now)
+        return added
+
+    def contains(self, url: str) -> bool:
+        row = self.connection.execute("SELECT 1 FROM newsletters WHERE normalized_url = ?",
+                                      (normalize_url(url),)).fetchone()
+        return row is not None
+
+    def set_status(self, url: str, status: str) -> None:
+        column = self._status_column(status)
+        now = time.time()
+        with self.connection:
+            self.connection.execute(
+                f"UPDATE newsletters SET status = ?, {column} = ?, updated_at = ? WHERE normalized_url = ?",
+                (status, now, now, normalize_url(url)))
+
+    def record_attempt(self, url: str, action: str, outcome: str, failure_class: str | None = None,
+                       detail: str | None = None) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO attempts (url, normalized_url, action, outcome, failure_class, detail, attempted_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, normalize_url(url), action, outcome, failure_class, detail, time.time()))
+
+    def iter_urls(self, status: str | None = None) -> Iterator[str]:
+        if status is None:
+            cursor = self.connection.execute("SELECT url FROM newsletters ORDER BY id")
+        else:
+            cursor = self.connection.execute("SELECT url FROM newsletters WHERE status = ? ORDER BY id", (status,))
+        for (url,) in cursor:
+            yield url
+
+    def iter_normalized_urls(self) -> Iterator[str]:
+        for (normalized_url,) in self.connection.execute("SELECT normalized_url FROM newsletters"):
+            yield normalized_url
+
+    def count(self, status: str | None = None) -> int:
+        if status is None:
+            return self.connection.execute("SELECT COUNT(*) FROM newsletters").fetchone()[0]
+        return self.connection.execute("SELECT COUNT(*) FROM newsletters WHERE status = ?", (status,)).fetchone()[0]
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def open_store(file_name: str = DEFAULT_LEDGER_FILE) -> NewsletterStore:
+    """
+    Open the newsletter ledger.
+
+    :param file_name: Path of the ledger database
+    :return: NewsletterStore instance
+    """
+    return SQLiteNewsletterStore(file_name=file_name)
 
 
 # Save newsletter URLs to an Excel file
-def save_newsletters_to_excel(newsletter_urls: List[str], file_name="subscribed_newsletters.xlsx") -> None:
+def save_newsletters_to_excel(newsletter_urls: List[str], file_name=DEFAULT_EXCEL_FILE) -> None:
     """
     Save the list of newsletter URLs to an Excel file.
 
     :param newsletter_urls: List of newsletter URLs to save
     :param file_name: Name of the Excel file
     """
+    import openpyxl
+
     if not os.path.exists(file_name):
-        workbook = Workbook()
+        workbook = openpyxl.Workbook()
         sheet: Worksheet | None = workbook.active
         if sheet:
             # Add a header row
@@ -38,7 +345,7 @@ def save_newsletters_to_excel(newsletter_urls: List[str], file_name="subscribed_
 
 
 # Load Newsletter URLs from the Excel file
-def load_newsletters_from_excel(file_name: str = "subscribed_newsletters.xlsx") -> list[str]:
+def load_newsletters_from_excel(file_name: str = DEFAULT_EXCEL_FILE) -> list[str]:
     """
     Load newsletter URLs from an Excel file.
 
@@ -49,6 +356,8 @@ def load_newsletters_from_excel(file_name: str = "subscribed_newsletters.xlsx")
         print(f"File {file_name} not found.")
         return []
 
+    import openpyxl
+
     workbook: Workbook = openpyxl.load_workbook(filename=file_name)
     sheet: Worksheet | None = workbook.active
 
@@ -58,3 +367,68 @@ def load_newsletters_from_excel(file_name: str = "subscribed_newsletters.xlsx")
             urls.append(row[0])
 
     return urls[1:]  # Skip the header row
+
+
+def export_store_to_excel(store: NewsletterStore, file_name: str = DEFAULT_EXCEL_FILE) -> int:
+    """
+    Export the ledger to an Excel file, overwriting the file if it exists.
+
+    :param store: NewsletterStore to export
+    :param file_name: Name of the Excel file
+    :return: Number of exported URLs
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(["Newsletter URLs"])
+
+    exported = 0
+    for url in store.iter_urls():
+        sheet.append([url])
+        exported += 1
+
+    workbook.save(filename=file_name)
+    print(f"Exported {exported} newsletters to {file_name}")
+    return exported
+
+
+def import_excel_into_store(store: NewsletterStore, file_name: str = DEFAULT_EXCEL_FILE) -> int:
+    """
+    Import newsletter URLs from an Excel file into the ledger, skipping URLs that are already stored.
+
+    :param store: NewsletterStore to import into
+    :param file_name: Name of the Excel file
+    :return: Number of imported URLs
+    """
+    if not os.path.exists(file_name):
+        print(f"File {file_name} not found.")
+        return 0
+
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(filename=file_name, read_only=True)
+    sheet = workbook.active
+
+    imported = 0
+    if sheet:
+        rows = sheet.iter_rows(min_row=2, values_only=True)  # Skip the header row
+        imported = store.add_many(row[0] for row in rows if row and row[0])
+    workbook.close()
+
+    print(f"Imported {imported} newsletters from {file_name}")
+    return imported
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import or export the newsletter ledger as an Excel file.")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("--ledger", default=DEFAULT_LEDGER_FILE, help="Path of the SQLite ledger")
+    parser.add_argument("--excel", default=DEFAULT_EXCEL_FILE, help="Path of the Excel file")
+    args = parser.parse_args()
+
+    with open_store(file_name=args.ledger) as newsletter_store:
+        if args.command == "export":
+            export_store_to_excel(store=newsletter_store, file_name=args.excel)
+        else:
+            import_excel_into_store(store=newsletter_store, file_name=args.excel)
@@ -0,0 +1,108 @@
+"""
+This module contains helpers to wait for the page to reach an expected state instead of sleeping for a fixed time.
+
+Waiting for the page (``wait_until``, ``wait_for_scroll_height_change``, ``wait_for_dom_quiet``) returns as soon as
+the expected state is reached. Pacing between actions is kept separate, in the ``scheduler`` module.
+"""
+import time
+from typing import Callable, TypeVar
+
+from selenium.common import TimeoutException
+from selenium.webdriver.chrome.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support.wait import WebDriverWait
+
+from metrics import metrics
+
+T = TypeVar("T")
+
+DEFAULT_TIMEOUT: float = 10  # Can be changed from the configuration file, read when each wait starts
+POLL_FREQUENCY: float = 0.1
+
+
+def report_wait(description: str, elapsed: float) -> None:
+    """
+    Report how long a wait took.
+
+    :param description: What was waited for
+    :param elapsed: Number of seconds waited
+    """
+    print(f"Waited {elapsed:.2f}s for {description}")
+    metrics.observe("wait_seconds", elapsed, target=description)
+
+
+def wait_until(driver: WebDriver, condition: Callable[[WebDriver], T], description: str,
+               timeout: float | None = None) -> T:
+    """
+    Wait until a condition returns a truthy value and report how long it took.
+
+    :param driver: WebDriver instance
+    :param condition: Callable taking the driver, e.g. an expected condition
+    :param description: What is waited for, used when reporting
+    :param timeout: Maximum number of seconds to wait, defaults to DEFAULT_TIMEOUT
+    :return: Value returned by the condition
+    :raises TimeoutException: If the condition is not met within the timeout
+    """
+    start = time.monotonic()
+    timeout = DEFAULT_TIMEOUT if timeout is None else timeout
+    try:
+        return WebDriverWait(driver, timeout=timeout, poll_frequency=POLL_FREQUENCY).until(condition)
+    finally:
+        report_wait(description, time.monotonic() - start)
+
+
+def wait_for_scroll_height_change(driver: WebDriver, element: WebElement, last_height: int,
+                                  timeout: float | None = None) -> int:
+    """
+    Wait until the scroll height of an element changes, i.e. new content has been loaded.
+
+    :param driver: WebDriver instance
+    :param element: Scrollable WebElement
+    :param last_height: Scroll height before scrolling
+    :param timeout: Maximum number of seconds to wait for new content, defaults to DEFAULT_TIMEOUT
+    :return: New scroll height, or ``last_height`` if no content was loaded within the timeout
+    """
+    def height_changed(d: WebDriver) -> int | bool:
+        height = d.execute_script("return arguments[0].scrollHeight", element)
+        return height if height != last_height else False
+
+    try:
+        return wait_until(driver, height_changed, description="new content", timeout=timeout)
+    except TimeoutException:
+        return last_height
+
+
+# Resolves once no mutation has been observed under the element for quiet_ms, or after timeout_ms
+_DOM_QUIET_SCRIPT = """
+const [element, quietMs, timeoutMs, done] = arguments;
+let timer = null;
+const finish = (quiet) => { observer.disconnect(); clearTimeout(timer); clearTimeout(deadline); done(quiet); };
+const observer = new MutationObserver(() => {
+    clearTimeout(timer);
+    timer = setTimeout(() => finish(true), quietMs);
+});
+observer.observe(element, {childList: true, subtree: true, attributes: true, characterData: true});
+timer = setTimeout(() => finish(true), quietMs);
+const deadline = setTimeout(() => finish(false), timeoutMs);
+"""
+
+
+def wait_for_dom_quiet(driver: WebDriver, element: WebElement, quiet_period: float = 0.5,
+                       timeout: float | None = None) -> bool:
+    """
+    Wait until the DOM under an element stops changing.
+
+    :param driver: WebDriver instance
+    :param element: WebElement to observe
+    :param quiet_period: Number of seconds without mutations after which the DOM is considered settled
+    :param timeout: Maximum number of seconds to wait, defaults to DEFAULT_TIMEOUT
+    :return: True if the DOM settled, False if it was still changing when the timeout expired
+    """
+    start = time.monotonic()
+    timeout = DEFAULT_TIMEOUT if timeout is None else timeout
+    driver.set_script_timeout(timeout + 1)
+    try:
+        return bool(driver.execute_async_script(_DOM_QUIET_SCRIPT, element, int(quiet_period * 1000),
+                                                int(timeout * 1000)))
+    finally:
+        report_wait("DOM to settle", time.monotonic() - start)